@@ -82,6 +82,29 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse a worker's connection across requests (checked before reuse)
+        # so the PRAGMAs below are paid once per connection, not per request.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds a connection waits on a locked database before raising
+            # "database is locked" (sqlite3's busy timeout).
+            'timeout': 20,
+            # Take the write lock when a transaction starts. A deferred
+            # transaction that reads and then writes can't wait for the lock
+            # and fails straight away, whatever the timeout.
+            'transaction_mode': 'IMMEDIATE',
+            # Run on every new connection; none of these change the file.
+            # WAL (readers carry on while e.g. the expiry sweep writes) is a
+            # property of the database file, so it is switched on once with
+            # `manage.py enable_sqlite_wal`, not here. On a WAL database each
+            # connection also gets synchronous=NORMAL (see myapp.signals).
+            'init_command': (
+                'PRAGMA mmap_size=134217728;'  # 128 MiB
+                'PRAGMA cache_size=-20000;'  # ~20 MB page cache
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        },
     }
 }
 
@@ -127,6 +150,9 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/images/'
 MEDIA_ROOT = BASE_DIR / 'images'
 
+# Runs the tests against temporary uploads, indexes and caches
+TEST_RUNNER = 'hirenix.test_runner.IsolatedTestRunner'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -135,6 +161,124 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = 'candidate/home/'
 
+# Resume scoring
+# The SentenceTransformer model is loaded lazily on the first scoring call.
+# Set HIRENIX_PRELOAD_MODEL=1 on web workers to load it at startup instead.
+PRELOAD_RESUME_MODEL = os.environ.get('HIRENIX_PRELOAD_MODEL') == '1'
+
+# Encoder backend: 'torch' (reference), 'quantized' (int8, faster on CPU) or
+# 'onnx' (ONNX Runtime; create the model with `manage.py export_onnx_encoder`).
+# Check a backend against the reference with `manage.py check_encoder_parity`.
+RESUME_ENCODER = {
+    'BACKEND': os.environ.get('HIRENIX_ENCODER_BACKEND', 'torch'),
+    'ONNX_PATH': BASE_DIR / 'models' / 'all-MiniLM-L6-v2.onnx',
+    # MiniLM only reads 256 word pieces, so long resumes are split into
+    # overlapping windows that are encoded together and pooled ('mean' or
+    # 'max'). MAX_TOKENS caps how much of a resume is read at all.
+    'CHUNKING': {
+        'ENABLED': True,
+        'WINDOW': 240,
+        'OVERLAP': 48,
+        'POOLING': 'mean',
+        'MAX_TOKENS': 2048,
+    },
+}
+
+# Resume text extraction runs in a pool of worker processes so one bad PDF
+# cannot stall a web or scoring worker (see myapp/utils/extraction_pool.py).
+RESUME_EXTRACTION = {
+    'WORKERS': 2,
+    'TIMEOUT': 20,           # seconds per file
+    'MAX_PAGES': 30,
+    'MAX_CHARS': 200_000,
+    # Stop reading once there is more text than the encoder will use. Every
+    # word is at least one word piece, so keep this >= CHUNKING['MAX_TOKENS'].
+    'MAX_WORDS': 4000,
+    # 'auto' uses pypdfium2 when installed, else PyPDF2; 'pdfminer' is opt-in.
+    # Compare them with `manage.py benchmark_pdf_backends`.
+    'PDF_BACKEND': 'auto',
+    'RECYCLE_AFTER': 50,     # files before a worker process is replaced
+    'MAX_MEMORY_MB': 512,    # per worker process (POSIX only)
+}
+
+# Memory-mapped index of candidate resume embeddings used by the
+# "top candidates" view. Rebuild with `manage.py build_resume_index`.
+RESUME_INDEX_DIR = BASE_DIR / 'var' / 'resume_index'
+
+# Same for active job embeddings, used by the candidate "jobs for you" feed.
+# Kept in sync by Job signals; rebuild with `manage.py build_job_index`.
+JOB_INDEX_DIR = BASE_DIR / 'var' / 'job_index'
+
+# Cache stack: each alias below is a per-process LRU (myapp.utils.tiered_cache)
+# in front of the "shared" cache, which all workers see. The shared tier is
+# file-based by default; set HIRENIX_REDIS_URL to use Redis instead, or
+# HIRENIX_CACHE=locmem for a purely in-process cache (single worker / tests).
+# Aliases namespace their keys with KEY_PREFIX and have their own TTLs.
+# `manage.py cache_stats` shows hit/miss counts.
+CACHE_DIR = BASE_DIR / 'var' / 'cache'
+
+CACHE_TIMEOUTS = {
+    'default': 300,
+    'jobs': 600,
+    'embeddings': 7 * 24 * 3600,  # keyed by content hash, never stale
+    'sessions': 14 * 24 * 3600,
+    'versions': None,  # fragment version stamps (myapp.utils.fragment_cache)
+}
+
+if os.environ.get('HIRENIX_REDIS_URL'):
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['HIRENIX_REDIS_URL'],
+    }
+elif os.environ.get('HIRENIX_CACHE') == 'locmem':
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hirenix-shared',
+    }
+else:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(CACHE_DIR),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+
+
+def tiered_cache(prefix, local_timeout=5, local_max_entries=1000):
+    return {
+        'BACKEND': 'myapp.utils.tiered_cache.TieredCache',
+        'KEY_PREFIX': prefix,
+        'TIMEOUT': CACHE_TIMEOUTS[prefix],
+        'OPTIONS': {
+            'SHARED': 'shared',
+            # Seconds another worker's write can go unseen here; 0 disables the LRU
+            'LOCAL_TIMEOUT': local_timeout,
+            'LOCAL_MAX_ENTRIES': local_max_entries,
+        },
+    }
+
+
+CACHES = {
+    'shared': {**SHARED_CACHE, 'TIMEOUT': None},
+    'default': tiered_cache('default'),
+    'jobs': tiered_cache('jobs'),
+    'embeddings': tiered_cache('embeddings', local_timeout=3600, local_max_entries=2000),
+    # Sessions must look the same from every worker (think logout)
+    'sessions': tiered_cache('sessions', local_timeout=0),
+    # Fragment version stamps likewise: a bump must reach every worker at once
+    'versions': tiered_cache('versions', local_timeout=0),
+}
+
+# Sessions are read from the "sessions" cache and only fall back to
+# django_session on a miss. Writes still go to both: SessionMiddleware only
+# saves a session that was modified, so this saves reads, not writes.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Seconds a cached dashboard/profile fragment may live. Fragments are keyed by
+# a per-user version stamp that model signals bump, so this only bounds how
+# long an unused fragment stays in the cache.
+FRAGMENT_CACHE_TIMEOUT = 600
+
 
 
 
@@ -0,0 +1,59 @@
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class IsolatedTestRunner(DiscoverRunner):
+    """
+    The default runner, with uploads, the vector indexes and the caches
+    moved to throwaway storage for the whole run, so model signals fired by
+    tests never touch var/ or images/.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="hirenix-tests-"))
+        self.temp_settings = override_settings(
+            MEDIA_ROOT=str(self.temp_dir / "media"),
+            RESUME_INDEX_DIR=str(self.temp_dir / "resume_index"),
+            JOB_INDEX_DIR=str(self.temp_dir / "job_index"),
+            CACHES={
+                **settings.CACHES,
+                # The tiered caches keep their shared tier in memory
+                "shared": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "tests-shared",
+                    "TIMEOUT": None,
+                },
+            },
+        )
+        self.temp_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.temp_settings.disable()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
+
+
+@contextmanager
+def throwaway_databases():
+    """
+    Run the block against freshly migrated test databases, with the same
+    isolated storage as the tests, for commands (benchmarks, query plans)
+    that must not write to the real database.
+    """
+    runner = IsolatedTestRunner(verbosity=0, interactive=False)
+    runner.setup_test_environment()
+    try:
+        old_config = runner.setup_databases()
+        try:
+            yield
+        finally:
+            runner.teardown_databases(old_config)
+    finally:
+        runner.teardown_test_environment()
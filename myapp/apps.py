@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 class MyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -6,3 +7,8 @@ class MyappConfig(AppConfig):
 
     def ready(self):
         import myapp.signals  # noqa
+
+        # Web workers can opt in to loading the scoring model at startup
+        if getattr(settings, "PRELOAD_RESUME_MODEL", False):
+            from myapp.utils.ranking import warm_up
+            warm_up()
@@ -0,0 +1,61 @@
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.utils.resume_parser import available_pdf_backends, iter_pdf_pages
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every installed PDF backend over the sample resumes and report "
+        "pages/sec and how closely its text matches PyPDF2's."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--resume-dir",
+            default=str(Path(settings.MEDIA_ROOT) / "resumes"),
+            help="Directory of .pdf resumes to extract (searched recursively).",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Passes over the files per backend.")
+
+    def handle(self, *args, **options):
+        files = sorted(str(p) for p in Path(options["resume_dir"]).rglob("*.pdf"))
+        if not files:
+            raise CommandError(f"No PDFs found in {options['resume_dir']}.")
+
+        # PyPDF2 first: it is the reference the others are compared against
+        backends = sorted(available_pdf_backends(), key=lambda name: name != "pypdf2")
+        texts = {}
+        self.stdout.write(f"{len(files)} file(s), {options['repeat']} pass(es) per backend\n")
+        self.stdout.write(f"{'backend':<12}{'pages':>8}{'seconds':>10}{'pages/sec':>12}{'similarity':>12}")
+
+        for backend in backends:
+            pages = 0
+            start = time.perf_counter()
+            for _ in range(options["repeat"]):
+                for path in files:
+                    page_texts = list(iter_pdf_pages(path, backend=backend))
+                    pages += len(page_texts)
+                    texts[(backend, path)] = "".join(page_texts)
+            elapsed = time.perf_counter() - start
+
+            # Word-level similarity to the PyPDF2 reference (1.0 = identical)
+            ratios = [
+                SequenceMatcher(
+                    None, texts[("pypdf2", path)].split(), texts[(backend, path)].split()
+                ).ratio()
+                for path in files
+            ]
+            similarity = f"{sum(ratios) / len(ratios):.3f}"
+
+            self.stdout.write(
+                f"{backend:<12}{pages:>8}{elapsed:>10.3f}{pages / elapsed:>12.1f}{similarity:>12}"
+            )
+
+        missing = sorted({"pypdfium2", "pdfminer"} - set(backends))
+        if missing:
+            self.stdout.write(f"\nNot installed: {', '.join(missing)}")
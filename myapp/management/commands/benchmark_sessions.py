@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hirenix.test_runner import throwaway_databases
+from myapp.models import CustomUser, Job
+
+BASELINE_ENGINE = "django.contrib.sessions.backends.db"
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the login and browse flows with the plain database session "
+        "engine and with SESSION_ENGINE, and count django_session reads and "
+        "writes per request. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=5, help="Passes over the browse pages.")
+
+    def handle(self, *args, **options):
+        engines = [BASELINE_ENGINE]
+        if settings.SESSION_ENGINE != BASELINE_ENGINE:
+            engines.append(settings.SESSION_ENGINE)
+
+        with throwaway_databases():
+            password = "session-bench"
+            user = CustomUser.objects.create_user(username="session-bench", password=password, is_employee=True)
+            company = CustomUser.objects.create_user(username="session-bench-co", password=password, is_company=True)
+            job = Job.objects.create(
+                company=company, title="Django developer", description="Build web apps.", location="Remote"
+            )
+
+            self.stdout.write(
+                f"{'engine':<45}{'flow':<8}{'requests':>10}{'reads':>8}{'writes':>8}{'reads/req':>11}{'writes/req':>12}"
+            )
+            for engine in engines:
+                with override_settings(SESSION_ENGINE=engine):
+                    for flow, steps in self.flows(user, password, job, options["rounds"]):
+                        # A fresh client per flow: the middleware picks up SESSION_ENGINE on first use
+                        requests, reads, writes = self.replay(Client(), steps)
+                        self.stdout.write(
+                            f"{engine:<45}{flow:<8}{requests:>10}{reads:>8}{writes:>8}"
+                            f"{reads / requests:>11.2f}{writes / requests:>12.2f}"
+                        )
+
+    def flows(self, user, password, job, rounds):
+        login_url = reverse("login")
+        login = [
+            ("get", login_url, None),
+            ("post", login_url, {"username": user.username, "password": "wrong"}),
+            ("post", login_url, {"username": user.username, "password": password}),
+            ("get", reverse("candidate_home"), None),
+        ]
+        browse = login[2:3]
+        for _ in range(rounds):
+            browse.append(("get", reverse("browse_jobs"), None))
+            browse.append(("get", reverse("browse_jobs"), {"q": "developer"}))
+            browse.append(("get", reverse("job_detail", args=[job.id]), None))
+        return [("login", login), ("browse", browse)]
+
+    def replay(self, client, steps):
+        reads = writes = 0
+        for method, url, data in steps:
+            with CaptureQueriesContext(connection) as ctx:
+                getattr(client, method)(url, data)
+            for query in ctx.captured_queries:
+                sql = query["sql"]
+                if "django_session" not in sql:
+                    continue
+                if sql.lstrip().upper().startswith("SELECT"):
+                    reads += 1
+                else:
+                    writes += 1
+        client.logout()
+        return len(steps), reads, writes
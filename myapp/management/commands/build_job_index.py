@@ -0,0 +1,23 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from myapp.models import Job
+from myapp.utils.ranking import get_job_embedding, get_job_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the vector index of active job embeddings from scratch."
+
+    def handle(self, *args, **options):
+        index = get_job_index()
+        index.clear()
+
+        ids, rows = [], []
+        for job in Job.objects.filter(is_active=True).iterator():
+            # Encodes only jobs whose cached embedding is missing or stale
+            ids.append(job.pk)
+            rows.append(get_job_embedding(job))
+
+        if ids:
+            index.add_many(ids, np.stack(rows))
+        self.stdout.write(self.style.SUCCESS(f"Indexed {len(ids)} active job(s)."))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from myapp.models import EmployeeProfile
+from myapp.utils.ranking import get_resume_index, index_profiles
+
+
+class Command(BaseCommand):
+    help = "Rebuild the vector index of candidate resume embeddings from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of profiles to embed and index per batch.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        profiles = (
+            EmployeeProfile.objects.exclude(resume="")
+            .exclude(resume__isnull=True)
+            .only("id", "resume")
+            .order_by("id")
+        )
+
+        get_resume_index().clear()
+        indexed = 0
+        failures = {}
+        batch = []
+        for profile in profiles.iterator(chunk_size=batch_size):
+            batch.append(profile)
+            if len(batch) == batch_size:
+                indexed += index_profiles(batch, failures=failures)
+                batch = []
+        if batch:
+            indexed += index_profiles(batch, failures=failures)
+
+        for path, error in failures.items():
+            self.stderr.write(f"Skipped {path}: {error}")
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} candidate resume(s)."))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+from myapp.utils.tiered_cache import TieredCache
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss statistics of the tiered caches, summed over all worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them.")
+
+    def handle(self, *args, **options):
+        header = f"{'cache':<12}{'local hits':>12}{'shared hits':>13}{'misses':>10}{'hit rate':>10}{'sets':>10}{'errors':>8}"
+        self.stdout.write(header)
+        for alias in settings.CACHES:
+            cache = caches[alias]
+            if not isinstance(cache, TieredCache):
+                continue
+            cache.flush_stats()
+            stats = cache.shared_stats()
+            lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+            hit_rate = f"{100 * (lookups - stats['misses']) / lookups:.1f}%" if lookups else "-"
+            self.stdout.write(
+                f"{alias:<12}{stats['local_hits']:>12}{stats['shared_hits']:>13}{stats['misses']:>10}"
+                f"{hit_rate:>10}{stats['sets']:>10}{stats['errors']:>8}"
+            )
+            if options["reset"]:
+                cache.reset_stats()
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.models import Job
+from myapp.utils.encoders import PARITY_TOLERANCE, build_encoder, score_drift
+from myapp.utils.ranking import MODEL_NAME
+from myapp.utils.resume_parser import extract_text_from_resume
+
+
+class Command(BaseCommand):
+    help = (
+        "Score sample resumes against jobs with the reference torch encoder and "
+        "another backend, and fail if match scores drift beyond a tolerance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backend", default="quantized", help="Backend to compare against torch.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=PARITY_TOLERANCE,
+            help="Largest allowed difference in match score, in percentage points.",
+        )
+        parser.add_argument(
+            "--resume-dir",
+            default=str(Path(settings.MEDIA_ROOT) / "resumes"),
+            help="Directory of .pdf/.docx resumes to score (searched recursively).",
+        )
+        parser.add_argument("--jobs", type=int, default=10, help="Number of jobs to score against.")
+
+    def handle(self, *args, **options):
+        resume_texts = []
+        # Uploads live in content-addressed subdirectories (resumes/<sha[:2]>/)
+        for path in sorted(Path(options["resume_dir"]).rglob("*")):
+            if path.suffix.lower() in (".pdf", ".docx"):
+                text = extract_text_from_resume(str(path))
+                if text:
+                    resume_texts.append(text)
+
+        job_texts = [job.embedding_text() for job in Job.objects.all()[:options["jobs"]]]
+        if not resume_texts or not job_texts:
+            raise CommandError("Need at least one readable resume and one job to compare.")
+
+        reference = build_encoder("torch", MODEL_NAME)
+        candidate = build_encoder(
+            options["backend"], MODEL_NAME, onnx_path=settings.RESUME_ENCODER.get("ONNX_PATH")
+        )
+
+        expected, actual = score_drift(reference, candidate, resume_texts, job_texts)
+        drift = np.abs(expected - actual)
+        top1_agreement = np.mean(expected.argmax(axis=0) == actual.argmax(axis=0)) * 100
+
+        self.stdout.write(
+            f"{options['backend']} vs torch over {len(resume_texts)} resumes x {len(job_texts)} jobs: "
+            f"max drift {drift.max():.2f} pts, mean drift {drift.mean():.2f} pts, "
+            f"top candidate agreement {top1_agreement:.0f}%"
+        )
+        if drift.max() > options["tolerance"]:
+            raise CommandError(
+                f"Scores drift by up to {drift.max():.2f} points, above the "
+                f"{options['tolerance']} point tolerance."
+            )
+        self.stdout.write(self.style.SUCCESS("Encoder parity OK."))
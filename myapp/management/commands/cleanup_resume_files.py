@@ -0,0 +1,83 @@
+import os
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from myapp.models import EmployeeProfile, JobApplication
+from myapp.utils.storage import ORPHAN_MIN_AGE, is_content_addressed, resume_storage
+
+RESUME_DIR = "resumes"
+
+
+class Command(BaseCommand):
+    help = (
+        "Move legacy resume files to content-addressed names (merging duplicates) "
+        "and delete resume files no profile or application references."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without touching files or rows.",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=ORPHAN_MIN_AGE // 60,
+            help="Only delete orphans older than this many minutes (protects in-flight uploads).",
+        )
+
+    def referenced_names(self):
+        names = set(EmployeeProfile.objects.exclude(resume="").values_list("resume", flat=True))
+        names |= set(JobApplication.objects.exclude(resume="").values_list("resume", flat=True))
+        names.discard(None)
+        return names
+
+    def stored_names(self):
+        root = resume_storage.path(RESUME_DIR)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                yield os.path.relpath(full_path, resume_storage.location).replace(os.sep, "/")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+
+        # 1) Rename legacy files (e.g. Farseen_resume_8Ya1eWf.pdf) to content names
+        moved = 0
+        for name in sorted(self.referenced_names()):
+            if is_content_addressed(name) or not resume_storage.exists(name):
+                continue
+            with resume_storage.open(name, "rb") as f:
+                new_name = resume_storage.content_name(name, File(f, name))
+                if not dry_run:
+                    new_name = resume_storage.save(name, File(f, name))
+            if not dry_run:
+                EmployeeProfile.objects.filter(resume=name).update(resume=new_name)
+                JobApplication.objects.filter(resume=name).update(resume=new_name)
+            moved += 1
+            self.stdout.write(f"{'Would move' if dry_run else 'Moved'} {name} -> {new_name}")
+
+        # 2) Delete files nothing points at any more
+        referenced = self.referenced_names()
+        cutoff = time.time() - options["min_age"] * 60
+        deleted = freed = 0
+        for name in self.stored_names():
+            if name in referenced:
+                continue
+            full_path = resume_storage.path(name)
+            if os.path.getmtime(full_path) > cutoff:
+                continue
+            size = os.path.getsize(full_path)
+            if not dry_run:
+                resume_storage.delete(name)
+            deleted += 1
+            freed += size
+            self.stdout.write(f"{'Would delete' if dry_run else 'Deleted'} {name}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{moved} file(s) renamed, {deleted} orphan(s) {'to delete' if dry_run else 'deleted'}, "
+            f"{freed / 1024:.1f} KiB reclaimed."
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Switch the SQLite database to WAL journal mode. This rewrites the "
+        "database file header once; the mode then sticks for every connection."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to convert.",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite":
+            raise CommandError("WAL journal mode only applies to SQLite databases.")
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            mode = cursor.fetchone()[0]
+        if mode != "wal":
+            raise CommandError(f"SQLite kept journal_mode={mode} (an in-memory database can't use WAL).")
+        self.stdout.write(self.style.SUCCESS(f"{connection.settings_dict['NAME']} now uses WAL journal mode."))
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from hirenix.test_runner import throwaway_databases
+from myapp.models import Job, JobApplication
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plans of the hot Job/JobApplication queries without "
+        "the Meta indexes and constraints, then with the current schema. Runs "
+        "against a throwaway test database; the real one is never touched."
+    )
+
+    def hot_queries(self):
+        today = timezone.now().date()
+        return {
+            "browse_jobs": Job.objects.filter(is_active=True)
+            .filter(Q(application_deadline__isnull=True) | Q(application_deadline__gte=today))
+            .order_by("-created_at")[:20],
+            "job_detail / apply_for_job": JobApplication.objects.filter(job_id=1, applicant_id=1)[:1],
+            "manage_applications": JobApplication.objects.filter(job__company_id=1)
+            .select_related("job", "applicant"),
+            "job_list": Job.objects.filter(company_id=1).order_by("-created_at")[:10],
+            "expired job sweep": Job.objects.filter(is_active=True, application_deadline__lt=today).order_by(),
+        }
+
+    def show_plans(self, title):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n=== {title} ==="))
+        for name, queryset in self.hot_queries().items():
+            self.stdout.write(self.style.MIGRATE_LABEL(f"\n{name}"))
+            self.stdout.write(queryset.explain())
+
+    def drop_meta_indexes(self, editor, model):
+        indexes, constraints = model._meta.indexes, model._meta.constraints
+        # SQLite drops a unique constraint by rebuilding the table from the
+        # model's Meta, so hide them from Meta while the schema is changed.
+        model._meta.indexes, model._meta.constraints = [], []
+        try:
+            for constraint in constraints:
+                editor.remove_constraint(model, constraint)
+            for index in indexes:
+                editor.remove_index(model, index)
+        finally:
+            model._meta.indexes, model._meta.constraints = indexes, constraints
+
+    def handle(self, *args, **options):
+        with throwaway_databases():
+            self.explain()
+
+    def explain(self):
+        if connection.vendor == "sqlite":
+            # The SQLite schema editor cannot run with FK checks on inside atomic()
+            connection.disable_constraint_checking()
+        try:
+            with transaction.atomic():
+                with connection.schema_editor(atomic=False) as editor:
+                    for model in (Job, JobApplication):
+                        self.drop_meta_indexes(editor, model)
+                self.show_plans("Before (without hot-path indexes)")
+                raise _Rollback
+        except _Rollback:
+            pass
+        finally:
+            if connection.vendor == "sqlite":
+                connection.enable_constraint_checking()
+
+        self.show_plans("After (current schema)")
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from myapp.utils.ranking import MODEL_NAME
+
+
+class Command(BaseCommand):
+    help = "Export the resume scoring model to ONNX for the 'onnx' encoder backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Where to write the .onnx file (defaults to RESUME_ENCODER['ONNX_PATH']).",
+        )
+        parser.add_argument("--opset", type=int, default=14)
+
+    def handle(self, *args, **options):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        output = Path(options["output"] or settings.RESUME_ENCODER["ONNX_PATH"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        model = SentenceTransformer(MODEL_NAME, device="cpu")
+        transformer = model[0].auto_model.eval()
+        sample = model.tokenizer(["Hirenix resume scoring"], return_tensors="pt")
+        input_names = [
+            name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample
+        ]
+
+        class LastHiddenState(torch.nn.Module):
+            """Expose only the token embeddings; pooling happens in OnnxEncoder."""
+
+            def __init__(self, inner):
+                super().__init__()
+                self.inner = inner
+
+            def forward(self, *inputs):
+                return self.inner(*inputs)[0]
+
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        torch.onnx.export(
+            LastHiddenState(transformer),
+            tuple(sample[name] for name in input_names),
+            str(output),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=options["opset"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Exported {MODEL_NAME} to {output}"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from myapp.utils.scoring_queue import run_worker
+
+
+class Command(BaseCommand):
+    help = "Run the resume scoring worker that fills in JobApplication match scores."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of polling for new tasks.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep between polls when the queue is empty.",
+        )
+        parser.add_argument(
+            "--max-tasks",
+            type=int,
+            default=None,
+            help="Stop after processing this many tasks.",
+        )
+
+    def handle(self, *args, **options):
+        processed = run_worker(
+            once=options["once"],
+            poll_interval=options["poll_interval"],
+            max_tasks=options["max_tasks"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} scoring task(s)."))
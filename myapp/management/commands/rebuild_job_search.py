@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from myapp.utils.job_search import FTS_TABLE, install_fts
+
+
+class Command(BaseCommand):
+    help = "Recreate the SQLite full-text search table and triggers and reindex every job."
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The FTS5 job search index only exists on SQLite.")
+
+        with connection.schema_editor() as editor:
+            install_fts(editor)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+            count = cursor.fetchone()[0]
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} job(s) for search."))
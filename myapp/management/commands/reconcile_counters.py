@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapp.utils.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute Job.applicant_count and the CompanyProfile job/application counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows have drifted; don't fix them.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            stale_jobs, stale_companies = reconcile_counters(dry_run=options["dry_run"])
+
+        verb = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stale_jobs} job(s) and {stale_companies} company profile(s) with stale counters."
+        ))
@@ -0,0 +1,100 @@
+import statistics
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+
+from myapp.models import Job
+from myapp.utils.job_expiry import open_jobs, sweep_expired_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run browse-style readers and expiry-sweep writers against the database "
+        "in parallel threads and report throughput, latency and lock errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=10.0, help="How long to run.")
+        parser.add_argument("--readers", type=int, default=8, help="Reader threads.")
+        parser.add_argument("--writers", type=int, default=2, help="Writer threads.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("This load test is for the SQLite profile only.")
+
+        with connection.cursor() as cursor:
+            pragmas = {}
+            for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size"):
+                cursor.execute(f"PRAGMA {name}")
+                pragmas[name] = cursor.fetchone()[0]
+        self.stdout.write(
+            ", ".join(f"{name}={value}" for name, value in pragmas.items())
+            + f", transaction_mode={connection.transaction_mode}"
+        )
+
+        deadline = time.monotonic() + options["seconds"]
+        results = {"read": [], "write": []}
+        errors = Counter()
+        lock = threading.Lock()
+
+        def run(kind, operation):
+            timings = []
+            try:
+                while time.monotonic() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        operation()
+                    except OperationalError as exc:
+                        with lock:
+                            errors[f"{kind}: {exc}"] += 1
+                        continue
+                    timings.append(time.perf_counter() - start)
+            finally:
+                # Each thread has its own connection; don't leave it open
+                connection.close()
+            with lock:
+                results[kind].extend(timings)
+
+        threads = [
+            threading.Thread(target=run, args=("read", self.read)) for _ in range(options["readers"])
+        ] + [
+            threading.Thread(target=run, args=("write", self.write)) for _ in range(options["writers"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.stdout.write(f"\n{'kind':<8}{'ops':>8}{'ops/sec':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for kind, timings in results.items():
+            if not timings:
+                self.stdout.write(f"{kind:<8}{0:>8}")
+                continue
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+            self.stdout.write(
+                f"{kind:<8}{len(timings):>8}{len(timings) / options['seconds']:>10.1f}"
+                f"{statistics.median(timings) * 1000:>10.2f}{p95 * 1000:>10.2f}{timings[-1] * 1000:>10.2f}"
+            )
+
+        if errors:
+            for message, count in errors.most_common():
+                self.stdout.write(self.style.ERROR(f"{count} x {message}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("\nNo lock errors."))
+
+    def read(self):
+        # What browse_jobs does for its first page
+        list(open_jobs().select_related("company").order_by("-created_at", "-id")[:11])
+        open_jobs().count()
+
+    def write(self):
+        with transaction.atomic():
+            sweep_expired_jobs()
+            # Rewrite every job row in place so the write lock is held for a
+            # realistic stretch; the values don't change.
+            Job.objects.update(applicant_count=F("applicant_count"))
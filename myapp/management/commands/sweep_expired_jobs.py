@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from myapp.utils.job_expiry import last_sweep, sweep_expired_jobs
+
+
+class Command(BaseCommand):
+    help = "Deactivate jobs past their application deadline and record when the sweep ran."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Keep running, sweeping every this many seconds (default: sweep once and exit).",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        previous = last_sweep()
+        if previous and previous.last_finished_at:
+            self.stdout.write(f"Previous sweep finished at {timezone.localtime(previous.last_finished_at):%Y-%m-%d %H:%M:%S}.")
+
+        while True:
+            count = sweep_expired_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Deactivated {count} expired job(s)."))
+            if interval is None:
+                break
+            time.sleep(interval)
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def mark_existing_scores(apps, schema_editor):
+    JobApplication = apps.get_model('myapp', 'JobApplication')
+    JobApplication.objects.filter(match_score__isnull=False).update(score_status='scored')
+
+
+def queue_unscored(apps, schema_editor):
+    # Applications from before the queue would otherwise stay 'pending' forever.
+    JobApplication = apps.get_model('myapp', 'JobApplication')
+    ScoringTask = apps.get_model('myapp', 'ScoringTask')
+    unscored = JobApplication.objects.filter(match_score__isnull=True)
+    no_resume = Q(resume='') | Q(resume__isnull=True)
+    unscored.filter(no_resume).update(score_status='failed')
+    ScoringTask.objects.bulk_create(
+        ScoringTask(application_id=pk)
+        for pk in unscored.exclude(no_resume).values_list('pk', flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0012_jobapplication_match_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='score_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('scored', 'Scored'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_scores, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ScoringTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scoring_tasks', to='myapp.jobapplication')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='myapp_scori_status_ad48e8_idx')],
+            },
+        ),
+        migrations.RunPython(queue_unscored, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_resumeembedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='embedding',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='embedding_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='embedding_model',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0016_job_embedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoringtask',
+            name='kind',
+            field=models.CharField(choices=[('application', 'Score application'), ('profile', 'Process profile resume')], default='application', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='scoringtask',
+            name='profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='scoring_tasks', to='myapp.employeeprofile'),
+        ),
+        migrations.AlterField(
+            model_name='scoringtask',
+            name='application',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='scoring_tasks', to='myapp.jobapplication'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:45
+
+import myapp.utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0017_scoringtask_profile'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employeeprofile',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=myapp.utils.storage.get_resume_storage, upload_to='resumes/'),
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=myapp.utils.storage.get_resume_storage, upload_to='resumes/'),
+        ),
+    ]
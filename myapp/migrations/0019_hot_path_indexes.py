@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:47
+
+from django.db import migrations, models
+
+
+def remove_duplicate_applications(apps, schema_editor):
+    """Keep the earliest application per (job, applicant) so the constraint can be added."""
+    JobApplication = apps.get_model('myapp', 'JobApplication')
+    seen = set()
+    duplicates = []
+    for app_id, job_id, applicant_id in JobApplication.objects.order_by('id').values_list('id', 'job_id', 'applicant_id'):
+        if (job_id, applicant_id) in seen:
+            duplicates.append(app_id)
+        else:
+            seen.add((job_id, applicant_id))
+    JobApplication.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0018_resume_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_applications, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='job_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['application_deadline'], name='job_active_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['company', '-created_at'], name='job_company_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobapplication',
+            constraint=models.UniqueConstraint(fields=('job', 'applicant'), name='unique_job_applicant'),
+        ),
+    ]
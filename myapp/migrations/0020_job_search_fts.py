@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def install_fts(apps, schema_editor):
+    from myapp.utils.job_search import install_fts
+    install_fts(schema_editor, triggers=False)
+
+
+def uninstall_fts(apps, schema_editor):
+    from myapp.utils.job_search import uninstall_fts
+    uninstall_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0019_hot_path_indexes'),
+    ]
+
+    operations = [
+        # FTS5 table on SQLite; other databases search the Job table in place.
+        # The sync triggers come in 0023, after 0022 has rebuilt myapp_job.
+        migrations.RunPython(install_fts, uninstall_fts),
+    ]
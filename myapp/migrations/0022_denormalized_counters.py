@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:53
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Job = apps.get_model('myapp', 'Job')
+    JobApplication = apps.get_model('myapp', 'JobApplication')
+    CompanyProfile = apps.get_model('myapp', 'CompanyProfile')
+
+    def count(queryset, group_field):
+        return Coalesce(Subquery(
+            queryset.order_by().values(group_field).annotate(n=Count('pk')).values('n'),
+            output_field=IntegerField(),
+        ), 0)
+
+    Job.objects.update(applicant_count=count(JobApplication.objects.filter(job=OuterRef('pk')), 'job'))
+    CompanyProfile.objects.update(
+        job_count=count(Job.objects.filter(company=OuterRef('user_id')), 'company'),
+        application_count=count(JobApplication.objects.filter(job__company=OuterRef('user_id')), 'job__company'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0021_maintenancerun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyprofile',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='companyprofile',
+            name='job_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applicant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+from myapp.utils.job_search import (
+    FTS_DROP_TRIGGER_SQL, FTS_POPULATE_SQL, FTS_TRIGGER_SQL, SqliteRunSQL,
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0022_denormalized_counters'),
+    ]
+
+    operations = [
+        # Triggers that keep myapp_job_fts in sync with job and company
+        # edits, plus a reindex for anything written since 0020.
+        SqliteRunSQL(FTS_TRIGGER_SQL + FTS_POPULATE_SQL, FTS_DROP_TRIGGER_SQL),
+    ]
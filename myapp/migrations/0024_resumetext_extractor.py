@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0023_job_search_fts_triggers'),
+    ]
+
+    operations = [
+        # Existing rows don't record which backend produced them and get an
+        # empty extractor, so they no longer match and are re-extracted on use.
+        migrations.AddField(
+            model_name='resumetext',
+            name='extractor',
+            field=models.CharField(blank=True, default='', max_length=30),
+        ),
+        migrations.AlterField(
+            model_name='resumetext',
+            name='sha256',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='resumetext',
+            constraint=models.UniqueConstraint(fields=('sha256', 'extractor'), name='unique_resume_text_extractor'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0024_resumetext_extractor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoringtask',
+            name='job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='scoring_tasks', to='myapp.job'),
+        ),
+        migrations.AlterField(
+            model_name='scoringtask',
+            name='kind',
+            field=models.CharField(choices=[('application', 'Score application'), ('profile', 'Process profile resume'), ('job', 'Embed job')], default='application', max_length=20),
+        ),
+    ]
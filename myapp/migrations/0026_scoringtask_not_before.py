@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0025_scoringtask_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoringtask',
+            name='not_before',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
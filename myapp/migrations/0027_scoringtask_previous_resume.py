@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0026_scoringtask_not_before'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoringtask',
+            name='previous_resume',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
@@ -3,6 +3,9 @@ from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
 from django.utils import timezone
+import numpy as np
+
+from .utils.storage import get_resume_storage
 
 class CustomUser(AbstractUser):
     is_company = models.BooleanField(default=False)
@@ -48,7 +51,7 @@ class EmployeeProfile(models.Model):
     bio = models.TextField(blank=True, null=True)
     location = models.CharField(max_length=255, blank=True, null=True)
     birthdate = models.DateField(blank=True, null=True)
-    resume = models.FileField(upload_to="resumes/", null=True, blank=True)
+    resume = models.FileField(upload_to="resumes/", storage=get_resume_storage, null=True, blank=True)
     skills = models.CharField(max_length=255, blank=True, null=True)  # could store comma-separated tags
     education = models.TextField(blank=True, null=True)  # or make a separate Education model
     work_experience = models.TextField(blank=True, null=True)
@@ -69,11 +72,15 @@ class CompanyProfile(models.Model):
     website = models.URLField(blank=True, null=True)
     about = models.TextField(blank=True, null=True)
 
+    # Denormalized counters, kept current by signals (see utils/counters.py)
+    job_count = models.PositiveIntegerField(default=0, editable=False)
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return f"Company Profile - {self.company_name}"
 
     def total_jobs_posted(self):
-        return self.jobs.count()  # assumes Job model has ForeignKey to CompanyProfile
+        return self.job_count
 
     def active_jobs(self):
         return self.jobs.filter(is_active=True)
@@ -145,9 +152,26 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Denormalized count of applications, kept current by signals (see utils/counters.py)
+    applicant_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Cached sentence embedding of description + requirements (see utils/ranking.py)
+    embedding = models.BinaryField(null=True, blank=True, editable=False)
+    embedding_model = models.CharField(max_length=100, blank=True, editable=False)
+    embedding_hash = models.CharField(max_length=64, blank=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Partial indexes: SQLite renders is_active=True as a bare column
+            # test, which a plain (is_active, ...) index cannot serve.
+            # browse_jobs: active jobs, newest first
+            models.Index(fields=["-created_at"], condition=models.Q(is_active=True), name="job_active_created_idx"),
+            # expiry sweep and deadline filter
+            models.Index(fields=["application_deadline"], condition=models.Q(is_active=True), name="job_active_deadline_idx"),
+            # job_list / company_dashboard: a company's jobs, newest first
+            models.Index(fields=["company", "-created_at"], name="job_company_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company}"
@@ -162,14 +186,145 @@ class Job(models.Model):
         if self.application_deadline:
             return self.is_active and self.application_deadline >= timezone.now().date()
         return self.is_active
+
+    def embedding_text(self):
+        """Text the job is scored on: the description plus its requirements."""
+        return "\n".join(part for part in (self.description, self.requirements) if part)
+
+    def embedding_array(self):
+        """Return the cached embedding as a float32 numpy array, or None."""
+        if not self.embedding:
+            return None
+        return np.frombuffer(bytes(self.embedding), dtype=np.float32)
     
 
 class JobApplication(models.Model):
+    SCORE_PENDING = "pending"
+    SCORE_SCORED = "scored"
+    SCORE_FAILED = "failed"
+
+    SCORE_STATUS_CHOICES = [
+        (SCORE_PENDING, "Pending"),
+        (SCORE_SCORED, "Scored"),
+        (SCORE_FAILED, "Failed"),
+    ]
+
     job = models.ForeignKey('Job', on_delete=models.CASCADE, related_name="applications")
     applicant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    resume = models.FileField(upload_to="resumes/", null=True, blank=True)  # New field
+    resume = models.FileField(upload_to="resumes/", storage=get_resume_storage, null=True, blank=True)  # New field
     applied_at = models.DateTimeField(auto_now_add=True)
     match_score = models.FloatField(null=True, blank=True)
+    score_status = models.CharField(max_length=10, choices=SCORE_STATUS_CHOICES, default=SCORE_PENDING)
+
+    class Meta:
+        constraints = [
+            # One application per candidate per job; also serves (job, applicant) lookups
+            models.UniqueConstraint(fields=["job", "applicant"], name="unique_job_applicant"),
+        ]
 
     def __str__(self):
         return f"{self.applicant.username} - {self.job.title}"
+
+
+class ScoringTask(models.Model):
+    """
+    A queued background job: score one application, extract and embed a
+    candidate's newly uploaded resume, or embed a new or edited job.
+    """
+    KIND_APPLICATION = "application"
+    KIND_PROFILE = "profile"
+    KIND_JOB = "job"
+
+    KIND_CHOICES = [
+        (KIND_APPLICATION, "Score application"),
+        (KIND_PROFILE, "Process profile resume"),
+        (KIND_JOB, "Embed job"),
+    ]
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_APPLICATION)
+    application = models.ForeignKey('JobApplication', on_delete=models.CASCADE, null=True, blank=True, related_name="scoring_tasks")
+    profile = models.ForeignKey('EmployeeProfile', on_delete=models.CASCADE, null=True, blank=True, related_name="scoring_tasks")
+    job = models.ForeignKey('Job', on_delete=models.CASCADE, null=True, blank=True, related_name="scoring_tasks")
+    previous_resume = models.CharField(max_length=255, blank=True, default="")  # replaced file, profile tasks only
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    not_before = models.DateTimeField(null=True, blank=True)  # retry backoff
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        if self.kind == self.KIND_PROFILE:
+            return f"ScoringTask #{self.pk} ({self.status}) - profile {self.profile_id}"
+        if self.kind == self.KIND_JOB:
+            return f"ScoringTask #{self.pk} ({self.status}) - job {self.job_id}"
+        return f"ScoringTask #{self.pk} ({self.status}) - application {self.application_id}"
+
+
+class ResumeText(models.Model):
+    """
+    Extracted resume text, keyed by the SHA-256 of the uploaded file's bytes
+    and the extractor that produced it (PDF backends return different text).
+    """
+    sha256 = models.CharField(max_length=64)
+    extractor = models.CharField(max_length=30, blank=True, default="")  # e.g. "pypdfium2"
+    text = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["sha256", "extractor"], name="unique_resume_text_extractor"),
+        ]
+
+    def __str__(self):
+        return f"ResumeText {self.sha256[:12]}"
+
+
+class ResumeEmbedding(models.Model):
+    """Sentence embedding of a resume's text, stored as raw float32 bytes."""
+    text_hash = models.CharField(max_length=64)  # SHA-256 of the extracted text
+    model_name = models.CharField(max_length=100)
+    dim = models.PositiveIntegerField()
+    vector = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["text_hash", "model_name"], name="unique_resume_embedding"),
+        ]
+
+    def __str__(self):
+        return f"ResumeEmbedding {self.text_hash[:12]} ({self.model_name})"
+
+    def as_array(self):
+        """Return the stored vector as a float32 numpy array."""
+        return np.frombuffer(bytes(self.vector), dtype=np.float32)
+
+
+class MaintenanceRun(models.Model):
+    """When a periodic maintenance command (e.g. the expiry sweeper) last ran."""
+    name = models.CharField(max_length=50, unique=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_affected = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} (last run {self.last_finished_at or 'never'})"
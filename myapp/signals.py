@@ -1,6 +1,28 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import CustomUser, EmployeeProfile, CompanyProfile, HRProfile
+from .models import CustomUser, EmployeeProfile, CompanyProfile, HRProfile, Job, JobApplication
+from .utils import counters
+from .utils.fragment_cache import bump_jobs, bump_user
+from .utils.ranking import get_job_index, get_resume_index, sync_job_index
+from .utils.storage import release_resume_file
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """
+    synchronous=NORMAL is durable in WAL mode except for the last commits on
+    power loss, but can corrupt a rollback-journal database, so it is only
+    set once the file has been switched to WAL (manage.py enable_sqlite_wal).
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        if cursor.fetchone()[0] == "wal":
+            cursor.execute("PRAGMA synchronous=NORMAL")
+
 
 @receiver(post_save, sender=CustomUser)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -24,3 +46,86 @@ def save_user_profile(sender, instance, **kwargs):
         instance.companyprofile.save()
     elif instance.is_hr and hasattr(instance, "hrprofile"):
         instance.hrprofile.save()
+
+
+@receiver(post_delete, sender=EmployeeProfile)
+def remove_profile_from_index(sender, instance, **kwargs):
+    """Keep deleted candidates out of the top-candidates search."""
+    get_resume_index().remove(instance.pk)
+
+
+@receiver(post_delete, sender=EmployeeProfile)
+@receiver(post_delete, sender=JobApplication)
+def release_resume(sender, instance, **kwargs):
+    """Delete a shared resume file once its last reference is gone."""
+    name = instance.resume.name
+    if name:
+        transaction.on_commit(lambda: release_resume_file(name))
+
+
+@receiver(post_save, sender=Job)
+def update_job_index(sender, instance, **kwargs):
+    """Created, edited or deactivated jobs update the recommendation index."""
+    sync_job_index(instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_index(sender, instance, **kwargs):
+    get_job_index().remove(instance.pk)
+
+
+@receiver(post_save, sender=JobApplication)
+def count_new_application(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.application_added(instance)
+
+
+@receiver(post_delete, sender=JobApplication)
+def count_deleted_application(sender, instance, **kwargs):
+    counters.application_removed(instance)
+
+
+@receiver(post_save, sender=Job)
+def count_new_job(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.job_added(instance)
+
+
+@receiver(post_delete, sender=Job)
+def count_deleted_job(sender, instance, **kwargs):
+    counters.job_removed(instance)
+
+
+# Cached dashboard/profile fragments (see utils/fragment_cache.py)
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_fragments(sender, instance, **kwargs):
+    bump_user(instance.company_id)
+    bump_jobs()  # job titles/companies on applicants' pages
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_application_fragments(sender, instance, **kwargs):
+    bump_user(instance.applicant_id)
+    bump_user(Job.objects.filter(pk=instance.job_id).values_list("company_id", flat=True).first())
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_delete, sender=EmployeeProfile)
+@receiver(post_save, sender=CompanyProfile)
+@receiver(post_delete, sender=CompanyProfile)
+def invalidate_profile_fragments(sender, instance, **kwargs):
+    bump_user(instance.pk if sender is CustomUser else instance.user_id)
+
+
+@receiver(post_save, sender=HRProfile)
+@receiver(post_delete, sender=HRProfile)
+def invalidate_hr_fragments(sender, instance, **kwargs):
+    bump_user(instance.user_id)
+    if instance.company_id:
+        # the company's HR list
+        bump_user(CompanyProfile.objects.filter(pk=instance.company_id).values_list("user_id", flat=True).first())
@@ -1,3 +1,1314 @@
-from django.test import TestCase
+import contextlib
+import importlib.util
+import io
+import itertools
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+import datetime
+import unittest
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper as SqliteDatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils import timezone
+
+from myapp.models import CompanyProfile, CustomUser, Job, JobApplication, ResumeText, ScoringTask
+from myapp.utils import ranking
+from myapp.utils.counters import reconcile_counters
+from myapp.utils.encoders import PARITY_TOLERANCE, build_encoder, chunk_text, pool_chunks, score_drift
+from myapp.utils import extraction_pool, resume_parser, tiered_cache
+from myapp.utils.extraction_pool import ExtractionError, ExtractionTimeout
+from myapp.utils.fragment_cache import USER_VERSION_KEY, VERSION_CACHE, fragment_key
+from myapp.utils.job_expiry import deactivate_expired_jobs, last_sweep, open_jobs, sweep_expired_jobs
+from myapp.utils.job_search import SNIPPET_TOKENS, search_jobs
+from myapp.templatetags.job_search import highlight
+from myapp.utils.pagination import InvalidCursor, KeysetPaginator
+from myapp.utils.ranking import rescore_applications
+from myapp.utils.resume_cache import file_sha256, get_resume_text, get_resume_texts
+from myapp.utils.resume_parser import available_pdf_backends, extract_text_from_resume
+from myapp.utils.storage import ORPHAN_MIN_AGE, is_content_addressed, resume_reference_count, resume_storage
+from myapp.utils.tiered_cache import TieredCache
+from myapp.utils.vector_index import CHANGE_LOG_LENGTH, INITIAL_CAPACITY, VectorIndex
+from myapp.utils.scoring_queue import (
+    MAX_ATTEMPTS, STALE_AFTER, claim_next_task, enqueue_application, enqueue_applications, enqueue_profile,
+    requeue_stale_tasks, retry_delay, run_worker,
+)
+
+
+class TempFilesMixin:
+    """
+    Give each test class its own uploads and vector indexes (the test runner
+    already keeps the whole run away from var/ and images/).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = Path(tempfile.mkdtemp())
+        cls.temp_settings = override_settings(
+            MEDIA_ROOT=str(cls.temp_dir / "media"),
+            RESUME_INDEX_DIR=str(cls.temp_dir / "resume_index"),
+            JOB_INDEX_DIR=str(cls.temp_dir / "job_index"),
+        )
+        cls.temp_settings.enable()
+        ranking._resume_index = ranking._job_index = None
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.temp_settings.disable()
+        ranking._resume_index = ranking._job_index = None
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+
+def make_company(username="acme"):
+    return CustomUser.objects.create_user(username=username, password="x", is_company=True)
+
+
+def make_job(company, **fields):
+    fields.setdefault("title", "Django developer")
+    fields.setdefault("description", "Build web apps with Django.")
+    fields.setdefault("location", "Remote")
+    return Job.objects.create(company=company, **fields)
+
+
+def make_resume(content=b"%PDF-1.4 resume", name="resume.pdf"):
+    return SimpleUploadedFile(name, content, content_type="application/pdf")
+
+
+@contextlib.contextmanager
+def fake_extraction(side_effect=None, return_value=None):
+    """Replace the extraction pool with a mock called once per file."""
+    extract = mock.Mock(side_effect=side_effect, return_value=return_value)
+
+    def extract_many(paths):
+        texts, errors = {}, {}
+        for path in paths:
+            try:
+                texts[path] = extract(path)
+            except ExtractionError as exc:
+                errors[path] = exc
+        return texts, errors
+
+    with mock.patch("myapp.utils.resume_cache.extract_text", extract), \
+            mock.patch("myapp.utils.resume_cache.extract_texts", extract_many):
+        yield extract
+
+
+def make_pdf(pages):
+    """A minimal PDF with one line of Helvetica text per page."""
+    count = len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(count)), count),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+class StreamingExtractionTests(TempFilesMixin, SimpleTestCase):
+    PAGES = ["first page words", "second page words", "third page words"]
+
+    def setUp(self):
+        self.path = str(self.temp_dir / "three-pages.pdf")
+        Path(self.path).write_bytes(make_pdf(self.PAGES))
+
+    def extract(self, backend, **limits):
+        return extract_text_from_resume(self.path, pdf_backend=backend, **limits).split()
+
+    def test_every_page_is_read_without_limits(self):
+        for backend in available_pdf_backends():
+            with self.subTest(backend=backend):
+                self.assertEqual(self.extract(backend), " ".join(self.PAGES).split())
+
+    def test_page_limit(self):
+        for backend in available_pdf_backends():
+            with self.subTest(backend=backend):
+                self.assertEqual(self.extract(backend, max_pages=2), " ".join(self.PAGES[:2]).split())
+
+    def test_char_limit_truncates(self):
+        for backend in available_pdf_backends():
+            with self.subTest(backend=backend):
+                text = extract_text_from_resume(self.path, pdf_backend=backend, max_chars=20)
+                self.assertLessEqual(len(text), 20)
+                self.assertTrue(text.startswith("first page words"))
+
+    def test_limits_stop_reading_further_pages(self):
+        read = []
+
+        def counting_pages(file_path, max_pages):
+            for text in resume_parser._pypdf2_pages(file_path, max_pages):
+                read.append(text)
+                yield text
+
+        with mock.patch.dict(resume_parser.PDF_BACKENDS, {"pypdf2": counting_pages}):
+            self.assertEqual(self.extract("pypdf2", max_words=4), " ".join(self.PAGES[:2]).split())
+            self.assertEqual(len(read), 2)
+
+            read.clear()
+            self.extract("pypdf2", max_chars=5)
+            self.assertEqual(len(read), 1)
+
+
+class ScoringQueueTests(TempFilesMixin, TestCase):
+    def setUp(self):
+        self.job = make_job(make_company())
+        applicant = CustomUser.objects.create_user(username="ann", password="x", is_employee=True)
+        self.application = JobApplication.objects.create(
+            job=self.job, applicant=applicant, resume=make_resume()
+        )
+        self.task = enqueue_application(self.application)
+
+    def test_failing_extraction_is_retried_then_marked_failed(self):
+        with fake_extraction(
+            side_effect=ExtractionTimeout("timed out")
+        ) as extract, self.assertLogs("myapp.utils.scoring_queue", "ERROR"):
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                self.assertEqual(run_worker(once=True), 1)
+                self.task.refresh_from_db()
+                if attempt < MAX_ATTEMPTS:
+                    # Backed off: the next run finds nothing ready
+                    self.assertEqual(self.task.status, ScoringTask.STATUS_QUEUED)
+                    self.assertGreater(self.task.not_before, timezone.now() + retry_delay(attempt) - datetime.timedelta(seconds=5))
+                    self.assertEqual(run_worker(once=True), 0)
+                    ScoringTask.objects.filter(pk=self.task.pk).update(not_before=timezone.now())
+
+        self.assertEqual(extract.call_count, MAX_ATTEMPTS)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, ScoringTask.STATUS_FAILED)
+        self.assertEqual(self.task.attempts, MAX_ATTEMPTS)
+        self.assertIn("timed out", self.task.last_error)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.score_status, JobApplication.SCORE_FAILED)
+        self.assertIsNone(self.application.match_score)
+
+    def test_resume_without_text_scores_zero(self):
+        with fake_extraction(return_value=""):
+            run_worker(once=True)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, ScoringTask.STATUS_DONE)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.score_status, JobApplication.SCORE_SCORED)
+        self.assertEqual(self.application.match_score, 0.0)
+
+    def test_stale_running_task_is_requeued_and_claimed_once(self):
+        self.assertEqual(claim_next_task(), self.task)
+        self.assertIsNone(claim_next_task())
+        self.assertEqual(requeue_stale_tasks(), 0)
+
+        # The worker holding it died: after STALE_AFTER it goes back on the queue
+        ScoringTask.objects.filter(pk=self.task.pk).update(
+            updated_at=timezone.now() - STALE_AFTER - datetime.timedelta(seconds=1)
+        )
+        self.assertEqual(requeue_stale_tasks(), 1)
+        claimed = claim_next_task()
+        self.assertEqual(claimed, self.task)
+        self.assertEqual(claimed.attempts, 2)
+
+    def test_task_that_keeps_killing_the_worker_is_failed(self):
+        ScoringTask.objects.filter(pk=self.task.pk).update(
+            status=ScoringTask.STATUS_RUNNING,
+            attempts=MAX_ATTEMPTS,
+            updated_at=timezone.now() - STALE_AFTER - datetime.timedelta(seconds=1),
+        )
+
+        self.assertEqual(requeue_stale_tasks(), 0)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, ScoringTask.STATUS_FAILED)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.score_status, JobApplication.SCORE_FAILED)
+
+    def test_long_running_worker_keeps_requeueing_stale_tasks(self):
+        clock = itertools.count(0, 30)  # every clock read is 30 s later
+        polls = [None] * 5 + [self.task]  # queue empty for five polls
+        with mock.patch("myapp.utils.scoring_queue.time.monotonic", lambda: next(clock)), \
+                mock.patch("myapp.utils.scoring_queue.time.sleep"), \
+                mock.patch("myapp.utils.scoring_queue.claim_next_task", side_effect=polls), \
+                mock.patch("myapp.utils.scoring_queue.process_task"), \
+                mock.patch("myapp.utils.scoring_queue.requeue_stale_tasks") as requeue:
+            run_worker(max_tasks=1)
+
+        self.assertGreater(requeue.call_count, 1)
+
+    def test_scoring_a_domain_queues_its_applications(self):
+        other = JobApplication.objects.create(
+            job=self.job,
+            applicant=CustomUser.objects.create_user(username="bob", password="x", is_employee=True),
+            resume=make_resume(),
+            score_status=JobApplication.SCORE_SCORED,
+        )
+        self.client.force_login(self.job.company)
+
+        with mock.patch("myapp.utils.ranking.get_encoder") as get_encoder:
+            response = self.client.post(reverse("parse_resumes", kwargs={"domain": self.job.domain}))
+
+        self.assertRedirects(response, reverse("manage_applications"), fetch_redirect_response=False)
+        get_encoder.assert_not_called()
+        # ann's application already had a task waiting; only bob's is added
+        self.assertEqual(ScoringTask.objects.filter(application=self.application).count(), 1)
+        self.assertEqual(ScoringTask.objects.filter(application=other, status=ScoringTask.STATUS_QUEUED).count(), 1)
+        other.refresh_from_db()
+        self.assertEqual(other.score_status, JobApplication.SCORE_PENDING)
+        self.assertEqual(enqueue_applications(JobApplication.objects.all()), 0)
+
+    def test_failing_profile_extraction_is_retried_then_marked_failed(self):
+        profile = self.application.applicant.employeeprofile
+        profile.resume = make_resume(b"%PDF-1.4 profile resume")
+        profile.save()
+        task = enqueue_profile(profile)
+
+        with fake_extraction(
+            side_effect=ExtractionTimeout("timed out")
+        ), self.assertLogs("myapp.utils.scoring_queue", "ERROR"):
+            while run_worker(once=True):
+                ScoringTask.objects.update(not_before=None)  # skip the backoff
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, ScoringTask.STATUS_FAILED)
+        self.assertEqual(task.attempts, MAX_ATTEMPTS)
+        self.assertFalse(ResumeText.objects.exists())
+
+
+class RescoreApplicationsTests(TempFilesMixin, TestCase):
+    def test_unreadable_resume_is_marked_failed_not_scored(self):
+        job = make_job(make_company())
+        readable, unreadable = [
+            JobApplication.objects.create(
+                job=job,
+                applicant=CustomUser.objects.create_user(username=name, password="x", is_employee=True),
+                resume=make_resume(name.encode()),
+                match_score=42.0,
+            )
+            for name in ("ann", "bob")
+        ]
+
+        def extract(path):
+            if path == unreadable.resume.path:
+                raise ExtractionTimeout("timed out")
+            return ""
+
+        with fake_extraction(side_effect=extract):
+            self.assertEqual(rescore_applications([readable, unreadable]), (1, 1))
+
+        readable.refresh_from_db()
+        unreadable.refresh_from_db()
+        self.assertEqual(readable.score_status, JobApplication.SCORE_SCORED)
+        self.assertEqual(readable.match_score, 0.0)
+        self.assertEqual(unreadable.score_status, JobApplication.SCORE_FAILED)
+        self.assertEqual(unreadable.match_score, 42.0)
+
+
+JOB_FORM = {
+    "title": "Backend engineer", "description": "APIs", "location": "Remote",
+    "job_type": "full_time", "experience_level": "mid", "domain": "django", "is_active": "on",
+}
+
+
+class JobEmbeddingTests(TempFilesMixin, TestCase):
+    def setUp(self):
+        self.company = make_company()
+        self.client.force_login(self.company)
+        # Job views must work without the model
+        encoder = mock.patch.object(ranking, "get_encoder", side_effect=ModuleNotFoundError("torch"))
+        self.get_encoder = encoder.start()
+        self.addCleanup(encoder.stop)
+
+    def job_tasks(self, job):
+        return ScoringTask.objects.filter(kind=ScoringTask.KIND_JOB, job=job)
+
+    def encoded_job(self):
+        job = make_job(self.company, **{k: v for k, v in JOB_FORM.items() if k in ("title", "description")})
+        job.embedding = unit_vectors(1)[0].tobytes()
+        job.embedding_model = ranking.embedding_key()
+        job.embedding_hash = ranking.text_sha256(job.embedding_text())
+        job.save()
+        return job
+
+    def test_job_create_queues_the_embedding(self):
+        response = self.client.post(reverse("job_create"), JOB_FORM)
+
+        self.assertRedirects(response, reverse("job_list"))
+        job = Job.objects.get(title="Backend engineer")
+        self.assertEqual(self.job_tasks(job).count(), 1)
+        self.get_encoder.assert_not_called()
+
+    def test_editing_the_scored_text_invalidates_the_embedding(self):
+        for field, value in (("description", "Payments APIs"), ("requirements", "Go")):
+            with self.subTest(field=field):
+                job = self.encoded_job()
+                self.client.post(reverse("job_edit", args=[job.pk]), {**JOB_FORM, field: value})
+                job.refresh_from_db()
+                self.assertEqual(job.embedding_hash, "")
+                self.assertFalse(ranking.job_embedding_is_current(job))
+                self.assertEqual(self.job_tasks(job).count(), 1)
+        self.get_encoder.assert_not_called()
+
+    def test_other_edits_keep_the_embedding(self):
+        job = self.encoded_job()
+        self.client.post(reverse("job_edit", args=[job.pk]), {**JOB_FORM, "title": "Platform engineer"})
+
+        job.refresh_from_db()
+        self.assertEqual(job.title, "Platform engineer")
+        self.assertTrue(ranking.job_embedding_is_current(job))
+        self.assertFalse(self.job_tasks(job).exists())
+
+    def test_worker_encodes_the_queued_job(self):
+        self.client.post(reverse("job_create"), JOB_FORM)
+        job = Job.objects.get(title="Backend engineer")
+        self.assertIsNone(ranking.top_candidates_for_job(job))
+
+        with mock.patch.object(ranking, "encode_text", return_value=unit_vectors(1)[0]):
+            run_worker(once=True)
+
+        job.refresh_from_db()
+        self.assertTrue(ranking.job_embedding_is_current(job))
+        self.assertIn(job.pk, ranking.get_job_index())
+        self.assertEqual(ranking.top_candidates_for_job(job), [])
+
+
+class RecommendJobsTests(TempFilesMixin, TestCase):
+    def setUp(self):
+        self.company = make_company()
+        applicant = CustomUser.objects.create_user(username="ann", password="x", is_employee=True)
+        self.profile = applicant.employeeprofile
+        self.profile.resume = make_resume()
+        self.profile.save()
+        resume = mock.patch.object(ranking, "get_resume_embedding", return_value=np.array([1.0, 0.0], dtype=np.float32))
+        resume.start()
+        self.addCleanup(resume.stop)
+
+    def job(self, title, vector):
+        job = make_job(self.company, title=title)
+        job.embedding = np.asarray(vector, dtype=np.float32).tobytes()
+        job.embedding_model = ranking.embedding_key()
+        job.save()  # the post_save signal puts it in the job index
+        return job
+
+    def test_open_jobs_are_ranked_by_similarity(self):
+        poor = self.job("Poor", [0.0, 1.0])
+        best = self.job("Best", [1.0, 0.0])
+        good = self.job("Good", [0.6, 0.8])
+
+        recommended = ranking.recommend_jobs_for_candidate(self.profile)
+
+        self.assertEqual([(job, score) for job, score in recommended], [(best, 100.0), (good, 60.0), (poor, 0.0)])
+        self.assertEqual([job for job, _ in ranking.recommend_jobs_for_candidate(self.profile, k=2)], [best, good])
+
+    def test_closed_and_applied_jobs_are_left_out(self):
+        open_job = self.job("Open", [0.6, 0.8])
+        inactive = self.job("Inactive", [1.0, 0.0])
+        expired = self.job("Expired", [1.0, 0.0])
+        applied = self.job("Applied", [1.0, 0.0])
+        # update() skips the signals, so these stay in the index
+        Job.objects.filter(pk=inactive.pk).update(is_active=False)
+        Job.objects.filter(pk=expired.pk).update(application_deadline=datetime.date.today() - datetime.timedelta(days=1))
+        JobApplication.objects.create(job=applied, applicant=self.profile.user)
+        self.assertEqual(len(ranking.get_job_index()), 4)
+
+        self.assertEqual(ranking.recommend_jobs_for_candidate(self.profile), [(open_job, 60.0)])
+
+    def test_no_resume_embedding_means_no_recommendations(self):
+        self.job("Best", [1.0, 0.0])
+        ranking.get_resume_embedding.return_value = None
+        self.assertEqual(ranking.recommend_jobs_for_candidate(self.profile), [])
+
+
+class SessionEngineTests(TempFilesMixin, TestCase):
+    def test_logged_in_requests_read_the_session_from_cache(self):
+        CustomUser.objects.create_user(username="ann", password="secret", is_employee=True)
+        self.client.post(reverse("login"), {"username": "ann", "password": "secret"})
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("browse_jobs"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user.username, "ann")
+        self.assertFalse([q for q in ctx.captured_queries if "django_session" in q["sql"]])
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "FTS5 search is SQLite only")
+class JobSearchTests(TempFilesMixin, TestCase):
+    def trigger_names(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'myapp_job_fts%'")
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_triggers_keep_the_index_in_sync(self):
+        job = make_job(make_company(), title="Senior Django engineer")
+        self.assertEqual(list(search_jobs(Job.objects.all(), "djan")), [job])
+
+        job.title = "Rust engineer"
+        job.description = "Systems work."
+        job.save()
+        self.assertEqual(list(search_jobs(Job.objects.all(), "django")), [])
+        self.assertEqual(list(search_jobs(Job.objects.all(), "rust")), [job])
+
+    def test_snippet_is_cut_by_fts_and_rendered_whole(self):
+        words = " ".join(f"requirement{i:03d} django" for i in range(100))
+        make_job(make_company(), description=words)
+        self.client.force_login(CustomUser.objects.create_user(username="ann", password="x"))
+
+        response = self.client.get(reverse("browse_jobs"), {"q": "django"})
+
+        snippet = response.context["jobs"].object_list[0].search_snippet
+        self.assertLessEqual(len(snippet.split()), SNIPPET_TOKENS)
+        self.assertGreater(len(snippet), 200)
+        html = response.content.decode()
+        self.assertIn(highlight(snippet), html)
+        self.assertEqual(html.count("<mark>"), html.count("</mark>"))
+
+    def test_migrate_leaves_the_triggers_alone(self):
+        self.assertEqual(len(self.trigger_names()), 4)
+        call_command("migrate", verbosity=0)
+        self.assertEqual(len(self.trigger_names()), 4)
+
+        job = make_job(make_company(), title="Senior Django engineer")
+        self.assertEqual(list(search_jobs(Job.objects.all(), "django")), [job])
+
+
+class SqliteConnectionTests(TempFilesMixin, SimpleTestCase):
+    def connect(self, path):
+        wrapper = SqliteDatabaseWrapper({**connection.settings_dict, "NAME": str(path)}, alias="tuning")
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            return cursor.fetchone()[0]
+
+    def test_connecting_does_not_convert_the_file(self):
+        path = self.temp_dir / "rollback.sqlite3"
+        sqlite3.connect(path).execute("CREATE TABLE t (x)").connection.close()
+        header = path.read_bytes()[:100]
+
+        self.assertEqual(self.connect(path), 2)  # FULL, the safe default here
+        self.assertEqual(path.read_bytes()[:100], header)
+
+    def test_wal_database_gets_synchronous_normal(self):
+        path = self.temp_dir / "wal.sqlite3"
+        db = sqlite3.connect(path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.close()
+
+        self.assertEqual(self.connect(path), 1)
+
+
+PARITY_RESUMES = [
+    "Backend developer, five years of Django and PostgreSQL, REST APIs, Celery, Docker.",
+    "Data scientist: pandas, scikit-learn, PyTorch; built churn and demand forecasting models.",
+    "Mobile developer shipping Kotlin and Swift apps, Firebase, CI with Fastlane.",
+    "Frontend engineer, React and TypeScript, accessibility audits, design systems.",
+]
+PARITY_JOBS = [
+    "Django developer to build and maintain our REST API on PostgreSQL.",
+    "Machine learning engineer for forecasting models in Python.",
+    "Android and iOS app developer.",
+]
+
+
+class ContentAddressedStorageTests(TempFilesMixin, TestCase):
+    def setUp(self):
+        self.job = make_job(make_company())
+
+    def apply(self, username, content):
+        applicant = CustomUser.objects.create_user(username=username, password="x", is_employee=True)
+        return JobApplication.objects.create(
+            job=self.job, applicant=applicant, resume=make_resume(content, name="CV.PDF")
+        )
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.apply("ann", b"%PDF-1.4 same")
+        second = self.apply("bob", b"%PDF-1.4 same")
+        other = self.apply("cat", b"%PDF-1.4 different")
+
+        self.assertEqual(first.resume.name, second.resume.name)
+        self.assertNotEqual(first.resume.name, other.resume.name)
+        self.assertTrue(is_content_addressed(first.resume.name))
+        self.assertTrue(first.resume.name.endswith(".pdf"))
+        self.assertEqual(first.resume.path, second.resume.path)
+        self.assertTrue(resume_storage.exists(first.resume.name))
+
+    def age(self, name, seconds=ORPHAN_MIN_AGE + 1):
+        stamp = time.time() - seconds
+        os.utime(resume_storage.path(name), (stamp, stamp))
+
+    def test_file_is_deleted_with_its_last_reference(self):
+        first = self.apply("ann", b"%PDF-1.4 same")
+        second = self.apply("bob", b"%PDF-1.4 same")
+        name = first.resume.name
+        self.assertEqual(resume_reference_count(name), 2)
+        self.age(name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(resume_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(resume_reference_count(name), 0)
+        self.assertFalse(resume_storage.exists(name))
+
+    def test_recently_written_file_is_kept_for_cleanup(self):
+        first = self.apply("ann", b"%PDF-1.4 same")
+        name = first.resume.name
+        self.age(name)
+        # An identical upload re-uses the file before its row is saved
+        resume_storage.save("resumes/CV.pdf", make_resume(b"%PDF-1.4 same"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(resume_storage.exists(name))
+
+        self.age(name)
+        call_command("cleanup_resume_files", stdout=io.StringIO())
+        self.assertFalse(resume_storage.exists(name))
+
+    def test_replaced_profile_resume_is_released_by_the_worker(self):
+        profile = CustomUser.objects.create_user(username="ann", password="x", is_employee=True).employeeprofile
+        profile.resume = make_resume(b"%PDF-1.4 old")
+        profile.save()
+        old = profile.resume.name
+        self.age(old)
+        ResumeText.objects.create(sha256=file_sha256(profile.resume.path), text="old resume")
+
+        profile.resume = make_resume(b"%PDF-1.4 new")
+        profile.save()
+        enqueue_profile(profile, previous_resume=old)
+        self.assertTrue(resume_storage.exists(old))
+
+        with fake_extraction(return_value=""):
+            run_worker(once=True)
+        self.assertFalse(resume_storage.exists(old))
+        self.assertFalse(ResumeText.objects.filter(text="old resume").exists())
+
+
+class KeysetPaginatorTests(TempFilesMixin, TestCase):
+    ORDERING = ("-created_at", "-id")
+
+    def setUp(self):
+        company = make_company()
+        base = datetime.datetime(2024, 5, 1, 12, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+        jobs = [make_job(company, title=f"Job {i}") for i in range(7)]
+        # Jobs 2-4 share a timestamp so only the id breaks the tie
+        for i, job in enumerate(jobs):
+            stamp = base if 2 <= i <= 4 else base + datetime.timedelta(microseconds=i)
+            Job.objects.filter(pk=job.pk).update(created_at=stamp)
+        self.expected = list(Job.objects.order_by(*self.ORDERING))
+
+    def paginator(self, per_page=3):
+        return KeysetPaginator(Job.objects.all(), self.ORDERING, per_page=per_page)
+
+    def test_cursor_round_trips_microsecond_timestamps(self):
+        paginator = self.paginator()
+        job = self.expected[0]
+        self.assertEqual(paginator.decode_cursor(paginator.encode_cursor(job)), [job.created_at, job.id])
+
+    def test_forward_pages_cover_the_full_ordering_across_ties(self):
+        paginator = self.paginator()
+        seen, after = [], None
+        while True:
+            page = paginator.page(after=after)
+            seen.extend(page)
+            if not page.has_next:
+                break
+            after = page.next_cursor
+        self.assertEqual(seen, self.expected)
+
+    def test_backward_pages_match_the_forward_ones(self):
+        paginator = self.paginator()
+        first = paginator.page()
+        second = paginator.page(after=first.next_cursor)
+        third = paginator.page(after=second.next_cursor)
+        self.assertFalse(third.has_next)
+
+        back = paginator.page(before=third.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        self.assertTrue(back.has_next)
+        self.assertTrue(back.has_previous)
+        back = paginator.page(before=back.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous)
+
+    def test_garbage_cursors_are_rejected(self):
+        paginator = self.paginator()
+        for cursor in ("!!!", "bm90IGpzb24", "WzFd", 'WyJub3QgYSBkYXRlIiwgMV0'):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                paginator.page(after=cursor)
+
+
+def installed(*modules):
+    return all(importlib.util.find_spec(module) is not None for module in modules)
+
+
+@unittest.skipUnless(installed("torch", "sentence_transformers"), "torch / sentence-transformers not installed")
+class EncoderParityTests(SimpleTestCase):
+    """Faster backends must keep match scores close to the torch reference."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        try:
+            cls.reference = build_encoder("torch", ranking.MODEL_NAME)
+        except OSError as exc:  # model weights not downloaded
+            raise unittest.SkipTest(f"{ranking.MODEL_NAME} is not available: {exc}")
+
+    def assertWithinTolerance(self, candidate):
+        expected, actual = score_drift(self.reference, candidate, PARITY_RESUMES, PARITY_JOBS)
+        self.assertLessEqual(abs(expected - actual).max(), PARITY_TOLERANCE)
+        # The best candidate for each job must not change
+        self.assertEqual(expected.argmax(axis=0).tolist(), actual.argmax(axis=0).tolist())
+
+    def test_quantized_scores_match_torch(self):
+        self.assertWithinTolerance(build_encoder("quantized", ranking.MODEL_NAME))
+
+    def test_onnx_scores_match_torch(self):
+        onnx_path = settings.RESUME_ENCODER.get("ONNX_PATH")
+        if not installed("onnxruntime", "transformers") or not onnx_path or not Path(onnx_path).exists():
+            self.skipTest("onnxruntime or the exported ONNX model is not installed")
+        self.assertWithinTolerance(build_encoder("onnx", ranking.MODEL_NAME, onnx_path=onnx_path))
+
+
+class NumberTokenizer:
+    """Word pieces are the numbers in the text, so chunks are easy to read."""
+
+    def __call__(self, text, add_special_tokens, truncation, max_length):
+        return {"input_ids": [int(word) for word in text.split()][:max_length]}
+
+    def decode(self, token_ids):
+        return " ".join(str(token) for token in token_ids)
+
+
+class ChunkingTests(SimpleTestCase):
+    def chunks(self, n, window=4, overlap=1, max_tokens=100):
+        text = " ".join(str(i) for i in range(n))
+        return [chunk.split() for chunk in chunk_text(NumberTokenizer(), text, window, overlap, max_tokens)]
+
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(chunk_text(NumberTokenizer(), "0 1 2 3", 4, 1, 100), ["0 1 2 3"])
+        self.assertEqual(chunk_text(NumberTokenizer(), "", 4, 1, 100), [""])
+
+    def test_windows_overlap_and_cover_the_text(self):
+        self.assertEqual(
+            self.chunks(10),
+            [["0", "1", "2", "3"], ["3", "4", "5", "6"], ["6", "7", "8", "9"]],
+        )
+        # The last window stops at the end instead of repeating a tail
+        self.assertEqual(self.chunks(11)[-1], ["9", "10"])
+        self.assertEqual(self.chunks(7, overlap=0), [["0", "1", "2", "3"], ["4", "5", "6"]])
+
+    def test_overlap_of_a_whole_window_still_advances(self):
+        self.assertEqual(len(self.chunks(6, window=3, overlap=3)), 4)
+
+    def test_only_the_first_max_tokens_are_chunked(self):
+        chunks = self.chunks(1000, max_tokens=10)
+        self.assertEqual(chunks[-1][-1], "9")
+
+    def test_mean_pooling_weighs_every_chunk_equally(self):
+        matrix = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+        pooled = pool_chunks(matrix, "mean")
+
+        np.testing.assert_allclose(pooled, np.array([2.0, 1.0]) / np.sqrt(5), rtol=1e-6)
+        self.assertAlmostEqual(float(np.linalg.norm(pooled)), 1.0, places=6)
+
+    def test_max_pooling_takes_each_dimension_from_its_strongest_chunk(self):
+        matrix = np.array([[0.6, 0.8], [1.0, 0.0]], dtype=np.float32)
+
+        np.testing.assert_allclose(pool_chunks(matrix, "max"), np.array([1.0, 0.8]) / np.sqrt(1.64), rtol=1e-6)
+
+    def test_unknown_pooling_is_rejected(self):
+        with self.assertRaises(ValueError):
+            pool_chunks(np.ones((2, 2), dtype=np.float32), "median")
+
+
+def unit_vectors(n, dim=8, seed=0):
+    matrix = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+class VectorIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.index = VectorIndex(self.directory, "model-a")
+
+    def test_search_returns_best_matches_first(self):
+        vectors = unit_vectors(50)
+        self.index.add_many(list(range(50)), vectors)
+
+        results = self.index.search(vectors[7], k=3)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0][0], 7)
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_resize_keeps_rows_and_cleans_up_old_generation(self):
+        vectors = unit_vectors(INITIAL_CAPACITY + 10)
+        self.index.add_many(list(range(10)), vectors[:10])
+        self.index.add_many(list(range(10, len(vectors))), vectors[10:])
+
+        self.assertEqual(len(self.index), len(vectors))
+        self.assertEqual(self.index.search(vectors[3], k=1)[0][0], 3)
+        self.assertEqual(self.index.search(vectors[-1], k=1)[0][0], len(vectors) - 1)
+        # Only the current generation's files are left on disk
+        self.assertEqual(len(list(self.directory.glob("vectors*.npy"))), 1)
+        self.assertEqual(len(list(self.directory.glob("ids*.npy"))), 1)
+
+    def test_other_instance_follows_a_resize(self):
+        vectors = unit_vectors(INITIAL_CAPACITY + 1)
+        reader = VectorIndex(self.directory, "model-a")
+        self.index.add_many(list(range(5)), vectors[:5])
+        self.assertEqual(len(reader), 5)
+
+        self.index.add_many(list(range(5, len(vectors))), vectors[5:])
+        self.assertEqual(len(reader), len(vectors))
+        self.assertEqual(reader.search(vectors[-1], k=1)[0][0], len(vectors) - 1)
+
+    def test_other_instance_catches_up_row_by_row(self):
+        vectors = unit_vectors(6)
+        self.index.add_many([1, 2, 3], vectors[:3])
+        reader = VectorIndex(self.directory, "model-a")
+        self.assertEqual(len(reader), 3)
+
+        self.index.remove(2)
+        self.index.add_many([4, 1], vectors[3:5])  # one new id, one overwrite
+        self.index.add(5, vectors[5])
+        with mock.patch.object(reader, "_load", wraps=reader._load) as load:
+            self.assertEqual(sorted(item for item, _ in reader.search(vectors[0], k=10)), [1, 3, 4, 5])
+            self.assertNotIn(2, reader)
+            self.assertEqual(reader.search(vectors[4], k=1)[0][0], 1)
+        load.assert_not_called()
+
+        # The reader's mapping stays right when it writes next
+        reader.add(6, vectors[0])
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(len(reader), 5)
+
+    def test_reader_too_far_behind_reloads(self):
+        vectors = unit_vectors(CHANGE_LOG_LENGTH + 2)
+        self.index.add_many([0], vectors[:1])
+        reader = VectorIndex(self.directory, "model-a")
+        self.assertEqual(len(reader), 1)
+
+        for i in range(1, len(vectors)):
+            self.index.add(i, vectors[i])
+        with mock.patch.object(reader, "_load", wraps=reader._load) as load:
+            self.assertEqual(len(reader), len(vectors))
+        load.assert_called_once()
+
+        # A write too big to log also sends readers back to a full reload
+        with mock.patch("myapp.utils.vector_index.MAX_LOGGED_ROWS", 4):
+            self.index.add_many(list(range(100, 105)), unit_vectors(5))
+        with mock.patch.object(reader, "_load", wraps=reader._load) as load:
+            self.assertIn(104, reader)
+        load.assert_called_once()
+
+    def test_index_without_generations_reads_as_empty(self):
+        np.save(self.directory / "vectors.npy", unit_vectors(1))
+        np.save(self.directory / "ids.npy", np.array([1], dtype=np.int64))
+        (self.directory / "meta.json").write_text('{"key": "model-a", "dim": 8, "version": 1}')
+
+        self.assertEqual(len(self.index), 0)
+
+    def test_remove_and_overwrite(self):
+        vectors = unit_vectors(3)
+        self.index.add_many([1, 2, 3], vectors)
+        self.index.remove(2)
+        self.index.remove(99)  # unknown ids are ignored
+        self.assertNotIn(2, self.index)
+        self.assertEqual(sorted(item for item, _ in self.index.search(vectors[1], k=3)), [1, 3])
+        self.assertEqual(len(self.index), 2)
+
+        replacement = unit_vectors(1, seed=1)[0]
+        self.index.add(1, replacement)
+        self.assertAlmostEqual(dict(self.index.search(replacement, k=2))[1], 1.0, places=5)
+        self.assertEqual(len(self.index), 2)
+
+    def test_index_built_with_another_model_reads_as_empty(self):
+        self.index.add_many([1], unit_vectors(1))
+        self.assertEqual(len(VectorIndex(self.directory, "model-b")), 0)
+
+    def test_dimension_mismatch_is_rejected(self):
+        self.index.add_many([1], unit_vectors(1, dim=8))
+        with self.assertRaises(ValueError):
+            self.index.add_many([2], unit_vectors(1, dim=4))
+
+    def test_clear(self):
+        self.index.add_many([1, 2], unit_vectors(2))
+        self.index.clear()
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.search(unit_vectors(1)[0]), [])
+        self.assertEqual(list(self.directory.glob("*.npy")), [])
+
+
+class CounterTests(TempFilesMixin, TestCase):
+    def setUp(self):
+        self.company = make_company()
+        self.job = make_job(self.company)
+
+    def profile(self):
+        return CompanyProfile.objects.get(user=self.company)
+
+    def apply(self, username):
+        applicant = CustomUser.objects.create_user(username=username, password="x", is_employee=True)
+        return JobApplication.objects.create(job=self.job, applicant=applicant)
+
+    def test_applications_increment_and_decrement(self):
+        first = self.apply("ann")
+        self.apply("bob")
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applicant_count, 2)
+        self.assertEqual(self.profile().application_count, 2)
+
+        first.delete()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applicant_count, 1)
+        self.assertEqual(self.profile().application_count, 1)
+
+    def test_jobs_increment_and_decrement(self):
+        second = make_job(self.company, title="Second")
+        self.assertEqual(self.profile().job_count, 2)
+        second.delete()
+        self.assertEqual(self.profile().job_count, 1)
+
+    def test_decrement_never_goes_below_zero(self):
+        application = self.apply("ann")
+        Job.objects.filter(pk=self.job.pk).update(applicant_count=0)
+        application.delete()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applicant_count, 0)
+
+    def test_reconcile_fixes_drift(self):
+        self.apply("ann")
+        Job.objects.filter(pk=self.job.pk).update(applicant_count=7)
+        CompanyProfile.objects.filter(user=self.company).update(job_count=0)
+
+        self.assertEqual(reconcile_counters(dry_run=True), (1, 1))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applicant_count, 7)
+
+        self.assertEqual(reconcile_counters(), (1, 1))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applicant_count, 1)
+        self.assertEqual(self.profile().job_count, 1)
+        self.assertEqual(reconcile_counters(dry_run=True), (0, 0))
+
+    def test_job_create_rolls_back_the_job_if_the_counter_update_fails(self):
+        self.client.force_login(self.company)
+        data = {
+            "title": "Backend engineer", "description": "APIs", "location": "Remote",
+            "job_type": "full_time", "experience_level": "mid", "domain": "django", "is_active": "on",
+        }
+        with mock.patch("myapp.signals.counters.job_added", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse("job_create"), data)
+        self.assertFalse(Job.objects.filter(title="Backend engineer").exists())
+
+
+class ApplyForJobTests(TempFilesMixin, TestCase):
+    def setUp(self):
+        self.job = make_job(make_company())
+        self.applicant = CustomUser.objects.create_user(username="ann", password="x", is_employee=True)
+        profile = self.applicant.employeeprofile
+        profile.resume = make_resume()
+        profile.save()
+        self.client.force_login(self.applicant)
+        self.url = reverse("apply_for_job", args=[self.job.id])
+
+    def test_second_application_is_rejected(self):
+        self.client.post(self.url)
+        response = self.client.post(self.url, follow=True)
+
+        self.assertEqual(JobApplication.objects.filter(job=self.job, applicant=self.applicant).count(), 1)
+        self.assertIn("already applied", [str(m) for m in response.context["messages"]][-1])
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        with mock.patch.object(JobApplication.objects, "create", side_effect=IntegrityError("NOT NULL")):
+            with self.assertRaises(IntegrityError):
+                self.client.post(self.url)
+
+
+class ManageApplicationsTests(TempFilesMixin, TestCase):
+    def setUp(self):
+        self.company = make_company()
+        django_job = make_job(self.company, domain="django")
+        ml_job = make_job(self.company, title="ML engineer", domain="ml")
+        # 21 django applications scored 1..21 (two pages), 2 unscored ml ones
+        for i in range(23):
+            applicant = CustomUser.objects.create_user(username=f"user{i}", is_employee=True)
+            JobApplication.objects.create(
+                job=django_job if i < 21 else ml_job,
+                applicant=applicant,
+                match_score=i + 1 if i < 21 else None,
+            )
+        self.client.force_login(self.company)
+
+    def sections(self, **params):
+        response = self.client.get(reverse("manage_applications"), params)
+        return response, {section["domain"]: section for section in response.context["sections"]}
+
+    def test_each_domain_pages_on_its_own(self):
+        _, sections = self.sections()
+        django = sections["django"]
+        self.assertEqual((django["number"], django["num_pages"], django["total"]), (1, 2, 21))
+        self.assertEqual([app.match_score for app in django["apps"]], list(range(21, 1, -1)))
+        self.assertEqual(len(sections["ml"]["apps"]), 2)
+
+        _, sections = self.sections(page_django=2)
+        self.assertEqual([app.match_score for app in sections["django"]["apps"]], [1])
+        self.assertEqual(sections["django"]["start"], 21)
+        self.assertEqual(len(sections["ml"]["apps"]), 2)
+
+        _, sections = self.sections(page_django="99", page_ml="x")
+        self.assertEqual(sections["django"]["number"], 2)
+        self.assertEqual(sections["ml"]["number"], 1)
+
+    def test_page_links_keep_the_other_domains_pages(self):
+        response, sections = self.sections(page_ml=1, sort="a b&c")
+        next_query = sections["django"]["next_query"]
+
+        self.assertEqual(QueryDict(next_query[1:]).dict(), {"page_ml": "1", "sort": "a b&c", "page_django": "2"})
+        self.assertContains(response, f'href="{escape(next_query)}"')
+        self.assertIsNone(sections["django"]["prev_query"])
+
+
+class ExpirySweepTests(TempFilesMixin, TestCase):
+    def test_sweep_deactivates_expired_jobs_and_invalidates_fragments(self):
+        company = make_company()
+        applicant = CustomUser.objects.create_user(username="ann", password="x", is_employee=True)
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        expired = make_job(company, title="Expired", application_deadline=yesterday)
+        current = make_job(company, title="Current")
+        company_key = fragment_key(company)
+        applicant_key = fragment_key(applicant, include_jobs=True)
+
+        self.assertEqual(sweep_expired_jobs(), 1)
+
+        expired.refresh_from_db()
+        self.assertFalse(expired.is_active)
+        self.assertEqual(list(open_jobs()), [current])
+        self.assertNotEqual(fragment_key(company), company_key)
+        self.assertNotEqual(fragment_key(applicant, include_jobs=True), applicant_key)
+        self.assertEqual(last_sweep().last_affected, 1)
+
+    def test_sweep_uses_the_deadline_index(self):
+        with CaptureQueriesContext(connection) as ctx:
+            deactivate_expired_jobs()
+        select = ctx.captured_queries[0]["sql"]
+
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + select)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("job_active_deadline_idx", plan)
+
+
+class BrokenCache:
+    """A shared tier whose every call fails, like an unreachable Redis."""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise OSError("cache down")
+        return fail
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        clock = mock.patch.object(tiered_cache, "time", mock.Mock(monotonic=lambda: self.now))
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.shared = caches["shared"]
+        self.shared.clear()
+
+    def make_cache(self, **options):
+        name = f"test-{self._testMethodName}"
+        self.addCleanup(tiered_cache._stores.pop, name, None)
+        options.setdefault("SHARED", "shared")
+        return TieredCache("", {"KEY_PREFIX": name, "TIMEOUT": 300, "OPTIONS": options})
+
+    def test_local_tier_evicts_least_recently_used(self):
+        cache = self.make_cache(LOCAL_MAX_ENTRIES=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.shared.clear()  # only the LRU can answer now
+
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+
+    def test_local_entries_expire_after_local_timeout(self):
+        cache = self.make_cache(LOCAL_TIMEOUT=5)
+        cache.set("k", "old")
+        self.shared.set(cache.make_key("k"), "new")  # another worker's write
+
+        self.now += 4
+        self.assertEqual(cache.get("k"), "old")
+        self.now += 2
+        self.assertEqual(cache.get("k"), "new")
+        self.assertEqual(cache.stats()["shared_hits"], 1)
+
+    def test_zero_local_timeout_always_reads_the_shared_tier(self):
+        cache = self.make_cache(LOCAL_TIMEOUT=0)
+        cache.set("k", 1)
+        self.shared.delete(cache.make_key("k"))
+        self.assertIsNone(cache.get("k"))
+
+    def test_local_tier_keeps_serving_when_the_shared_tier_fails(self):
+        cache = self.make_cache()
+        with mock.patch.object(TieredCache, "shared", BrokenCache()), \
+                self.assertLogs("myapp.utils.tiered_cache", "WARNING"):
+            cache.set("k", 1)
+            self.assertEqual(cache.get("k"), 1)
+            self.assertIsNone(cache.get("missing"))
+            self.assertTrue(cache.add("other", 2))
+            self.assertFalse(cache.add("k", 3))
+
+        stats = cache.stats()
+        self.assertEqual(stats["errors"], 4)
+        self.assertEqual(stats["local_hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_incr_counts_locally_when_the_shared_tier_fails(self):
+        cache = self.make_cache()
+        cache.set("n", 1)
+        with mock.patch.object(TieredCache, "shared", BrokenCache()), \
+                self.assertLogs("myapp.utils.tiered_cache", "WARNING"):
+            self.assertEqual(cache.incr("n"), 2)
+            with self.assertRaises(ValueError):
+                cache.incr("missing")
+        self.assertEqual(cache.stats()["errors"], 2)
+
+    def test_stats_are_flushed_to_the_shared_tier(self):
+        cache = self.make_cache()
+        cache.set("k", 1)
+        cache.get("k")
+        cache.get("missing")
+        cache.flush_stats()
+
+        totals = cache.shared_stats()
+        self.assertEqual((totals["sets"], totals["local_hits"], totals["misses"]), (1, 1, 1))
+        cache.reset_stats()
+        self.assertEqual(cache.shared_stats()["sets"], 0)
+
+
+class FragmentVersionTests(TempFilesMixin, TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.user = make_company()
+
+    def test_a_bump_elsewhere_is_seen_at_once(self):
+        key = fragment_key(self.user)
+        self.assertEqual(fragment_key(self.user), key)
+
+        # Another worker bumps the stamp straight in the shared tier
+        versions = caches[VERSION_CACHE]
+        caches["shared"].incr(versions.make_key(USER_VERSION_KEY.format(self.user.pk)))
+        self.assertNotEqual(fragment_key(self.user), key)
+
+    def test_hr_profile_follows_company_and_job_changes(self):
+        hr = CustomUser.objects.create_user(username="hana", password="x", is_hr=True)
+        company = CompanyProfile.objects.get(user=self.user)
+        hr.hrprofile.company = company
+        hr.hrprofile.save()
+        self.client.force_login(hr)
+
+        def profile_key():
+            return self.client.get(reverse("profile")).context["fragment_key"]
+
+        key = profile_key()
+        self.assertEqual(profile_key(), key)
+        company.about = "We build things."
+        company.save()
+        self.assertNotEqual(profile_key(), key)
+
+        key = profile_key()
+        make_job(self.user)
+        self.assertNotEqual(profile_key(), key)
+
+    def test_saves_succeed_while_the_cache_is_down(self):
+        with mock.patch.object(TieredCache, "shared", BrokenCache()), \
+                self.assertLogs("myapp.utils.tiered_cache", "WARNING"):
+            job = make_job(self.user)
+            applicant = CustomUser.objects.create_user(username="ann", password="x", is_employee=True)
+            JobApplication.objects.create(job=job, applicant=applicant)
+            job.title = "Renamed"
+            job.save()
+            # No stamp can be stored, so no fragment is reused
+            self.assertNotEqual(fragment_key(self.user), fragment_key(self.user))
+        self.assertEqual(JobApplication.objects.count(), 1)
+
+
+class FakeResult:
+    def __init__(self, release):
+        self.release = release
+
+    def get(self, timeout):
+        if self.release is None or not self.release.wait(timeout=5):
+            raise multiprocessing.TimeoutError
+        return "text"
+
+
+STUCK = object()
+
+
+class FakeIterator:
+    """imap_unordered result: finished files first, then a stuck worker."""
+
+    def __init__(self, finished):
+        self.finished = finished
+
+    def next(self, timeout):
+        if not self.finished:
+            raise multiprocessing.TimeoutError
+        path, outcome = self.finished.pop(0)
+        if isinstance(outcome, Exception):
+            return path, None, str(outcome)
+        return path, outcome, None
+
+
+class FakePool:
+    def __init__(self, config):
+        self.results = {}  # file path -> FakeResult
+        self.outcomes = {}  # file path -> text, exception or STUCK
+        self.terminated = False
+
+    def apply_async(self, func, args, kwargs):
+        return self.results[args[0]]
+
+    def imap_unordered(self, func, paths):
+        return FakeIterator([(path, self.outcomes[path]) for path in paths if self.outcomes[path] is not STUCK])
+
+    def terminate(self):
+        self.terminated = True
+
+
+@mock.patch.object(extraction_pool, "_new_pool", FakePool)
+class ExtractionPoolTests(SimpleTestCase):
+    def setUp(self):
+        extraction_pool.shutdown()
+        self.addCleanup(extraction_pool.shutdown)
+
+    def test_timeout_retires_the_pool_without_killing_other_extractions(self):
+        release = threading.Event()
+        pool = extraction_pool._acquire_pool()
+        extraction_pool._release_pool(pool)
+        pool.results = {"a.pdf": FakeResult(release), "stuck.pdf": FakeResult(None)}
+
+        outcome = []
+        other = threading.Thread(target=lambda: outcome.append(extraction_pool.extract_text("a.pdf")))
+        other.start()
+        with self.assertRaises(ExtractionTimeout), self.assertLogs("myapp.utils.extraction_pool", "WARNING"):
+            extraction_pool.extract_text("stuck.pdf")
+
+        # New work goes to a fresh pool; the running extraction is left alone
+        self.assertFalse(pool.terminated)
+        fresh = extraction_pool._acquire_pool()
+        extraction_pool._release_pool(fresh)
+        self.assertIsNot(fresh, pool)
+
+        release.set()
+        other.join()
+        self.assertEqual(outcome, ["text"])
+        self.assertTrue(pool.terminated)
+        self.assertFalse(fresh.terminated)
+
+
+    def fake_pool(self, **outcomes):
+        pool = extraction_pool._acquire_pool()
+        extraction_pool._release_pool(pool)
+        pool.outcomes = outcomes
+        return pool
+
+    def test_batch_collects_texts_and_errors(self):
+        pool = self.fake_pool(**{"a.pdf": "A", "b.pdf": ValueError("bad pdf")})
+
+        texts, errors = extraction_pool.extract_texts(["a.pdf", "b.pdf"])
+
+        self.assertEqual(texts, {"a.pdf": "A"})
+        self.assertIsInstance(errors["b.pdf"], ExtractionError)
+        self.assertNotIsInstance(errors["b.pdf"], ExtractionTimeout)
+        self.assertFalse(pool.terminated)
+
+    def test_batch_timeout_retires_the_pool(self):
+        pool = self.fake_pool(**{"a.pdf": "A", "stuck.pdf": STUCK, "queued.pdf": STUCK})
+
+        with self.assertLogs("myapp.utils.extraction_pool", "WARNING"):
+            texts, errors = extraction_pool.extract_texts(["a.pdf", "stuck.pdf", "queued.pdf"])
+
+        self.assertEqual(texts, {"a.pdf": "A"})
+        self.assertEqual(set(errors), {"stuck.pdf", "queued.pdf"})
+        self.assertTrue(all(isinstance(exc, ExtractionTimeout) for exc in errors.values()))
+        self.assertTrue(pool.terminated)
+
+
+class ExtractionPoolProcessTests(TempFilesMixin, SimpleTestCase):
+    def setUp(self):
+        extraction_pool.shutdown()
+        self.addCleanup(extraction_pool.shutdown)
+
+    def test_files_are_extracted_by_the_worker_processes(self):
+        paths = [str(self.temp_dir / f"{name}.pdf") for name in ("ann", "bob")]
+        for path, name in zip(paths, ("Ann", "Bob")):
+            Path(path).write_bytes(make_pdf([f"{name} resume"]))
+        missing = str(self.temp_dir / "missing.pdf")
+
+        with override_settings(RESUME_EXTRACTION={"WORKERS": 2, "PDF_BACKEND": "pypdf2"}):
+            texts, errors = extraction_pool.extract_texts(paths + [missing])
+
+        self.assertEqual(texts, {paths[0]: "Ann resume", paths[1]: "Bob resume"})
+        self.assertEqual(list(errors), [missing])
+
+
+class ResumeTextCacheTests(TempFilesMixin, TestCase):
+    def setUp(self):
+        name = resume_storage.save("resumes/cv.pdf", make_resume())
+        self.path = resume_storage.path(name)
+
+    def extract(self, backend, text, batched=False):
+        with override_settings(RESUME_EXTRACTION={"PDF_BACKEND": backend}), fake_extraction(
+            return_value=text
+        ) as extract:
+            result = get_resume_texts([self.path])[self.path] if batched else get_resume_text(self.path)
+        return result, extract.call_count
+
+    def test_text_is_cached_per_backend(self):
+        self.assertEqual(self.extract("pypdf2", "from pypdf2"), ("from pypdf2", 1))
+        self.assertEqual(self.extract("pypdf2", "unused"), ("from pypdf2", 0))
+        # Another backend doesn't reuse pypdf2's text
+        self.assertEqual(self.extract("pypdfium2", "from pdfium", batched=True), ("from pdfium", 1))
+        self.assertEqual(self.extract("pypdfium2", "unused", batched=True), ("from pdfium", 0))
+        self.assertEqual(ResumeText.objects.count(), 2)
@@ -48,6 +48,7 @@ urlpatterns = [
 
     path("jobs/<int:job_id>/apply/", views.apply_for_job, name="apply_for_job"),
     path("jobs/<int:job_id>/applicants/", views.view_applicants, name="view_applicants"),
+    path("jobs/<int:job_id>/top-candidates/", views.job_top_candidates, name="job_top_candidates"),
     path("company/applications/", views.manage_applications, name="manage_applications"),
 
     # application URLs
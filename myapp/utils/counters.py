@@ -0,0 +1,79 @@
+"""
+Denormalized counters: Job.applicant_count, CompanyProfile.job_count and
+CompanyProfile.application_count.
+
+Signals adjust them with F() expressions, so each change is one UPDATE
+applied by the database and concurrent writers can't lose increments.
+Deletes run the signal inside Django's delete transaction. A save is not
+atomic by itself, so code creating jobs or applications wraps the save in
+transaction.atomic() (job_create and apply_for_job do) to commit the row
+and its counter update together. Dashboards read the counters instead of
+aggregating the applications table.
+reconcile_counters() recomputes them from scratch in case they drift,
+e.g. after raw SQL or bulk operations that skip signals.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from myapp.models import CompanyProfile, Job, JobApplication
+
+
+def _adjust(queryset, delta, *fields):
+    if delta >= 0:
+        updates = {field: F(field) + delta for field in fields}
+    else:
+        # Never go below zero if a counter has already drifted
+        updates = {field: Greatest(F(field) + delta, Value(0)) for field in fields}
+    queryset.update(**updates)
+
+
+def application_added(application, delta=1):
+    _adjust(Job.objects.filter(pk=application.job_id), delta, "applicant_count")
+    _adjust(
+        CompanyProfile.objects.filter(user__jobs=application.job_id),
+        delta,
+        "application_count",
+    )
+
+
+def application_removed(application):
+    application_added(application, delta=-1)
+
+
+def job_added(job, delta=1):
+    _adjust(CompanyProfile.objects.filter(user_id=job.company_id), delta, "job_count")
+
+
+def job_removed(job):
+    job_added(job, delta=-1)
+
+
+def _count(queryset, group_field):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group_field).annotate(n=Count("pk")).values("n"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def reconcile_counters(dry_run=False):
+    """
+    Recompute every counter from the source tables; returns the number of
+    jobs and company profiles whose stored counters were wrong.
+    """
+    job_truth = _count(JobApplication.objects.filter(job=OuterRef("pk")), "job")
+    company_jobs = _count(Job.objects.filter(company=OuterRef("user_id")), "company")
+    company_apps = _count(JobApplication.objects.filter(job__company=OuterRef("user_id")), "job__company")
+
+    stale_jobs = Job.objects.annotate(actual=job_truth).exclude(applicant_count=F("actual"))
+    stale_companies = CompanyProfile.objects.annotate(
+        actual_jobs=company_jobs, actual_apps=company_apps,
+    ).exclude(job_count=F("actual_jobs"), application_count=F("actual_apps"))
+
+    drift = (stale_jobs.count(), stale_companies.count())
+    if not dry_run:
+        Job.objects.update(applicant_count=job_truth)
+        CompanyProfile.objects.update(job_count=company_jobs, application_count=company_apps)
+    return drift
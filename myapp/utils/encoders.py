@@ -0,0 +1,189 @@
+"""
+Sentence encoder backends for resume scoring.
+
+The backend is picked with ``RESUME_ENCODER["BACKEND"]`` in settings:
+
+- ``torch``: the stock SentenceTransformer model (reference implementation)
+- ``quantized``: the same model with its Linear layers dynamically quantized
+  to int8, which runs noticeably faster on CPU-only nodes
+- ``onnx``: an ONNX Runtime session over a model exported with
+  ``manage.py export_onnx_encoder`` (needs ``onnxruntime``)
+
+Every backend returns L2-normalized float32 vectors. ``signature`` is stored
+next to cached embeddings so vectors from different backends are never mixed.
+"""
+import numpy as np
+
+MAX_SEQ_LENGTH = 256
+
+# Largest match score difference (percentage points) a backend may show
+# against the torch reference; see check_encoder_parity and the tests.
+PARITY_TOLERANCE = 2.0
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class TorchEncoder:
+    name = "torch"
+    # Empty for the reference backend so existing cached rows stay valid
+    signature_suffix = ""
+
+    def __init__(self, model_name, **options):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    @property
+    def signature(self):
+        return self.model_name + self.signature_suffix
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    def encode(self, texts, batch_size=32):
+        embeddings = self.model.encode(
+            list(texts),
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class QuantizedTorchEncoder(TorchEncoder):
+    name = "quantized"
+    signature_suffix = "+int8"
+
+    def __init__(self, model_name, **options):
+        import torch
+
+        super().__init__(model_name, **options)
+        torch.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+
+
+class OnnxEncoder:
+    name = "onnx"
+    signature_suffix = "+onnx"
+
+    def __init__(self, model_name, onnx_path=None, **options):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        if not onnx_path:
+            raise ValueError("RESUME_ENCODER['ONNX_PATH'] must be set for the onnx backend.")
+
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(f"sentence-transformers/{model_name}")
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(onnx_path), session_options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    @property
+    def signature(self):
+        return self.model_name + self.signature_suffix
+
+    def encode(self, texts, batch_size=32):
+        texts = list(texts)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            feed = {k: v.astype(np.int64) for k, v in tokens.items() if k in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+
+            # Mean pooling over real tokens, as SentenceTransformer does
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(_normalize(pooled))
+
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(batches)
+
+
+def chunk_text(tokenizer, text, window, overlap, max_tokens):
+    """
+    Split text into overlapping windows of at most ``window`` word pieces.
+
+    Only the first ``max_tokens`` word pieces are considered, so the number of
+    chunks (and the cost of encoding them) is bounded for any resume.
+    """
+    token_ids = tokenizer(
+        text, add_special_tokens=False, truncation=True, max_length=max_tokens
+    )["input_ids"]
+    if len(token_ids) <= window:
+        return [text]
+
+    stride = max(window - overlap, 1)
+    chunks = []
+    for start in range(0, len(token_ids), stride):
+        chunks.append(tokenizer.decode(token_ids[start:start + window]))
+        if start + window >= len(token_ids):
+            break
+    return chunks
+
+
+def pool_chunks(matrix, pooling):
+    """Pool chunk embeddings into one unit-length vector ('mean' or 'max')."""
+    if pooling == "max":
+        pooled = matrix.max(axis=0)
+    elif pooling == "mean":
+        pooled = matrix.mean(axis=0)
+    else:
+        raise ValueError(f"Unknown chunk pooling {pooling!r}; expected 'mean' or 'max'.")
+    return _normalize(pooled[None, :])[0]
+
+
+def score_drift(reference, candidate, resume_texts, job_texts):
+    """
+    Match scores of every resume against every job under two encoders.
+
+    Returns ``(expected, actual)`` score matrices in percentage points, one
+    row per resume; ``abs(expected - actual)`` is the drift.
+    """
+    def scores(encoder):
+        return encoder.encode(resume_texts) @ encoder.encode(job_texts).T * 100
+
+    return scores(reference), scores(candidate)
+
+
+BACKENDS = {
+    TorchEncoder.name: TorchEncoder,
+    QuantizedTorchEncoder.name: QuantizedTorchEncoder,
+    OnnxEncoder.name: OnnxEncoder,
+}
+
+
+def get_backend_class(backend):
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown resume encoder backend {backend!r}; expected one of {sorted(BACKENDS)}."
+        )
+
+
+def encoder_signature(backend, model_name):
+    """Cache key for embeddings produced by ``backend``, without loading it."""
+    return model_name + get_backend_class(backend).signature_suffix
+
+
+def build_encoder(backend, model_name, **options):
+    """Instantiate the encoder for ``backend``."""
+    return get_backend_class(backend)(model_name, **options)
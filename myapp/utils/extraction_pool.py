@@ -0,0 +1,203 @@
+"""
+Resume text extraction in a bounded pool of worker processes.
+
+PDF parsing is pure Python and a hostile or huge file can pin a CPU and grow
+memory for minutes. Running it in separate processes gives every file a
+wall-clock timeout, page/word/character caps and an optional address-space
+limit, and workers are replaced after a number of files so leaks do not pile
+up.
+
+A worker that times out can't be killed on its own, so its pool is retired:
+new calls go to a fresh pool while extractions already running in the old
+one finish normally, and the old pool (with the stuck worker) is terminated
+once the last of them returns.
+"""
+import atexit
+import functools
+import logging
+import multiprocessing
+import threading
+
+from django.conf import settings
+
+from .resume_parser import extract_text_from_resume
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "WORKERS": 2,
+    "TIMEOUT": 20,  # seconds per file
+    "MAX_PAGES": 30,
+    "MAX_CHARS": 200_000,
+    "MAX_WORDS": None,
+    "PDF_BACKEND": "auto",
+    "RECYCLE_AFTER": 50,  # files per worker process
+    "MAX_MEMORY_MB": 512,  # per worker, POSIX only; None to disable
+}
+
+
+class ExtractionError(Exception):
+    """Text could not be extracted from a resume."""
+
+
+class ExtractionTimeout(ExtractionError):
+    """Extraction took longer than RESUME_EXTRACTION['TIMEOUT']."""
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_in_flight = {}  # pool -> calls waiting on it
+_retired = set()  # pools that take no new work and are terminated when idle
+
+
+def extraction_settings():
+    return {**DEFAULTS, **getattr(settings, "RESUME_EXTRACTION", {})}
+
+
+def _limit_memory(max_memory_mb):
+    """Pool initializer: cap the worker's address space."""
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    limit = max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _new_pool(config):
+    # spawn: workers must not inherit Django's DB connections or locks
+    return multiprocessing.get_context("spawn").Pool(
+        processes=config["WORKERS"],
+        initializer=_limit_memory,
+        initargs=(config["MAX_MEMORY_MB"],),
+        maxtasksperchild=config["RECYCLE_AFTER"],
+    )
+
+
+def _acquire_pool():
+    """Return the current pool, counting the caller as in flight on it."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _new_pool(extraction_settings())
+        _in_flight[_pool] = _in_flight.get(_pool, 0) + 1
+        return _pool
+
+
+def _release_pool(pool):
+    """The caller is done with ``pool``; terminate it if it was retired and is now idle."""
+    with _pool_lock:
+        _in_flight[pool] -= 1
+        idle = pool in _retired and not _in_flight[pool]
+        if idle:
+            _retired.discard(pool)
+            del _in_flight[pool]
+    if idle:
+        pool.terminate()
+
+
+def _retire_pool(pool):
+    """Stop sending work to a pool with a stuck worker; the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        _retired.add(pool)
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        pools = set(_retired) | ({_pool} if _pool is not None else set())
+        _pool = None
+        _retired.clear()
+        _in_flight.clear()
+    for pool in pools:
+        pool.terminate()
+
+
+atexit.register(shutdown)
+
+
+def _extractor_options(config):
+    return {
+        "max_pages": config["MAX_PAGES"],
+        "max_chars": config["MAX_CHARS"],
+        "max_words": config["MAX_WORDS"],
+        "pdf_backend": config["PDF_BACKEND"],
+    }
+
+
+def extract_text(file_path):
+    """
+    Extract resume text in a worker process under the configured limits.
+
+    Raises ``ExtractionTimeout`` if the file takes too long and
+    ``ExtractionError`` if the worker fails (bad file, out of memory, ...).
+    """
+    config = extraction_settings()
+    pool = _acquire_pool()
+    try:
+        result = pool.apply_async(
+            extract_text_from_resume, (str(file_path),), _extractor_options(config)
+        )
+        return result.get(timeout=config["TIMEOUT"])
+    except multiprocessing.TimeoutError:
+        logger.warning("Resume extraction timed out after %ss: %s", config["TIMEOUT"], file_path)
+        _retire_pool(pool)
+        raise ExtractionTimeout(f"Extraction timed out after {config['TIMEOUT']}s.")
+    except Exception as exc:
+        raise ExtractionError(str(exc)) from exc
+    finally:
+        _release_pool(pool)
+
+
+def _extract_one(file_path, options):
+    """Worker side of ``extract_texts``: report errors instead of raising them."""
+    try:
+        return file_path, extract_text_from_resume(file_path, **options), None
+    except Exception as exc:
+        return file_path, None, str(exc)
+
+
+def extract_texts(file_paths):
+    """
+    Extract many resumes at once, spread over all the pool's workers.
+
+    Returns ``(texts, errors)``: ``{path: text}`` and ``{path: ExtractionError}``.
+    If no file finishes within TIMEOUT seconds a worker is stuck: the pool
+    is retired as in ``extract_text`` and every file without a result yet
+    gets an ``ExtractionTimeout``.
+    """
+    paths = {str(path): path for path in file_paths}
+    texts, errors = {}, {}
+    if not paths:
+        return texts, errors
+
+    config = extraction_settings()
+    pool = _acquire_pool()
+    try:
+        results = pool.imap_unordered(
+            functools.partial(_extract_one, options=_extractor_options(config)), list(paths)
+        )
+        for _ in range(len(paths)):
+            name, text, error = results.next(timeout=config["TIMEOUT"])
+            if error is None:
+                texts[paths[name]] = text
+            else:
+                errors[paths[name]] = ExtractionError(error)
+    except multiprocessing.TimeoutError:
+        logger.warning("Resume extraction timed out after %ss", config["TIMEOUT"])
+        _retire_pool(pool)
+        for path in paths.values():
+            if path not in texts and path not in errors:
+                errors[path] = ExtractionTimeout(f"Extraction timed out after {config['TIMEOUT']}s.")
+    except Exception as exc:
+        for path in paths.values():
+            if path not in texts and path not in errors:
+                errors[path] = ExtractionError(str(exc))
+    finally:
+        _release_pool(pool)
+    return texts, errors
@@ -0,0 +1,95 @@
+"""
+Version stamps for per-user template fragment caching.
+
+Templates wrap their data-heavy parts in ``{% cache fragment_timeout name
+fragment_key %}``, where fragment_key combines the user's id and version
+stamp (plus the job catalogue stamp where job details are shown, and the
+company's stamp on an HR member's pages). Signals in
+myapp/signals.py bump the stamps whenever a Job, JobApplication or profile
+changes, so a new key is used and the stale fragment is never read again.
+Querysets handed to the template stay lazy, so a cache hit runs no queries
+for the fragment at all.
+
+The stamps live in the "versions" cache, which has no per-process tier: a
+bump must be seen by every worker at once. Cache failures never propagate,
+since bumps run inside model signals; if the cache is down, fragments are
+simply not reused.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE = "versions"
+USER_VERSION_KEY = "fragver:user:{}"
+JOBS_VERSION_KEY = "fragver:jobs"
+
+
+def _fresh_stamp():
+    # Starting from the clock rather than 1 means a stamp that was evicted
+    # and recreated can't repeat a value an old fragment was stored under.
+    return time.time_ns()
+
+
+def _bump(key):
+    store = caches[VERSION_CACHE]
+    try:
+        try:
+            store.incr(key)
+        except ValueError:
+            store.add(key, _fresh_stamp(), timeout=None)
+    except Exception:
+        # incr is not supported or the backend is down: any new value will do
+        try:
+            store.set(key, _fresh_stamp(), timeout=None)
+        except Exception:
+            logger.warning("Could not bump fragment version %r", key, exc_info=True)
+
+
+def bump_user(user_id):
+    if user_id is not None:
+        _bump(USER_VERSION_KEY.format(user_id))
+
+
+def bump_jobs():
+    _bump(JOBS_VERSION_KEY)
+
+
+def _stamp(key):
+    store = caches[VERSION_CACHE]
+    try:
+        stamp = store.get(key)
+        if stamp is None:
+            store.add(key, _fresh_stamp(), timeout=None)
+            stamp = store.get(key)
+    except Exception:
+        logger.warning("Could not read fragment version %r", key, exc_info=True)
+        stamp = None
+    # Without a stored stamp, use a one-off key so no stale fragment is read
+    return stamp if stamp is not None else _fresh_stamp()
+
+
+def fragment_key(user, include_jobs=False, company=None):
+    """
+    Cache key part for ``user``'s fragments at their current version.
+
+    ``company`` (a CompanyProfile) adds that company's stamp, for fragments
+    that show another account's company details or jobs.
+    """
+    parts = [user.pk, _stamp(USER_VERSION_KEY.format(user.pk))]
+    if company is not None:
+        parts.append(_stamp(USER_VERSION_KEY.format(company.user_id)))
+    if include_jobs:
+        parts.append(_stamp(JOBS_VERSION_KEY))
+    return ".".join(str(part) for part in parts)
+
+
+def fragment_context(user, include_jobs=False, company=None):
+    """Template context for ``{% cache fragment_timeout <name> fragment_key %}``."""
+    return {
+        "fragment_key": fragment_key(user, include_jobs=include_jobs, company=company),
+        "fragment_timeout": getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 600),
+    }
@@ -0,0 +1,69 @@
+"""
+Expiry sweeper: deactivates jobs whose application deadline has passed.
+
+This runs from the sweep_expired_jobs management command (cron or its
+--interval loop) rather than on page views, so the read paths never write.
+They filter on the deadline themselves and don't depend on the sweeper
+being current.
+"""
+from django.db.models import Q
+from django.utils import timezone
+
+from myapp.models import Job, MaintenanceRun
+from .fragment_cache import bump_jobs, bump_user
+from .ranking import get_job_index
+
+SWEEP_NAME = "expire_jobs"
+
+
+def open_jobs(queryset=None, today=None):
+    """Active jobs whose deadline is today, in the future, or not set."""
+    if queryset is None:
+        queryset = Job.objects.all()
+    today = today or timezone.now().date()
+    return queryset.filter(is_active=True).filter(
+        Q(application_deadline__isnull=True) | Q(application_deadline__gte=today)
+    )
+
+
+def deactivate_expired_jobs(today=None):
+    """Mark expired jobs as inactive in the DB and return how many there were."""
+    today = today or timezone.now().date()
+    # No ordering: Meta's -created_at would make SQLite walk
+    # job_active_created_idx instead of the deadline range.
+    expired = dict(
+        Job.objects.filter(is_active=True, application_deadline__lt=today)
+        .order_by()
+        .values_list("id", "company_id")
+    )
+    if expired:
+        Job.objects.filter(id__in=expired).update(is_active=False)
+        # update() skips signals, so do their work here: drop the jobs from the
+        # recommendation index and invalidate the cached fragments listing them
+        job_index = get_job_index()
+        for job_id in expired:
+            job_index.remove(job_id)
+        for company_id in set(expired.values()):
+            bump_user(company_id)
+        bump_jobs()
+    return len(expired)
+
+
+def sweep_expired_jobs():
+    """Run the sweep and record when it ran; returns the number deactivated."""
+    started = timezone.now()
+    count = deactivate_expired_jobs(today=started.date())
+    MaintenanceRun.objects.update_or_create(
+        name=SWEEP_NAME,
+        defaults={
+            "last_started_at": started,
+            "last_finished_at": timezone.now(),
+            "last_affected": count,
+        },
+    )
+    return count
+
+
+def last_sweep():
+    """The recorded MaintenanceRun of the last sweep, or None if it never ran."""
+    return MaintenanceRun.objects.filter(name=SWEEP_NAME).first()
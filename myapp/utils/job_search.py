@@ -0,0 +1,232 @@
+"""
+Full-text search over jobs for browse_jobs.
+
+Each backend narrows a Job queryset to the jobs matching a search string and
+annotates them with ``search_rank`` (higher is better) and ``search_snippet``
+(matched text with hits wrapped in HIGHLIGHT_START / HIGHLIGHT_END, see the
+``highlight`` template filter).
+
+- SQLite: an FTS5 table (``myapp_job_fts``, migration 0020) ranked with
+  bm25 and kept in sync by the triggers from migration 0023. The SQLite
+  build must include FTS5, as Python's bundled one does.
+- PostgreSQL: tsvector / tsquery via django.contrib.postgres.
+- Anything else: the old icontains scan.
+
+SQLite alters a table by rebuilding and renaming it. The rebuild drops the
+triggers on myapp_job, and the rename fails while the username trigger still
+names myapp_job. A later migration that alters myapp_job or myapp_customuser
+must therefore drop the triggers first and recreate them afterwards::
+
+    SqliteRunSQL(FTS_DROP_TRIGGER_SQL, FTS_TRIGGER_SQL),
+    migrations.AddField(model_name="job", ...),
+    SqliteRunSQL(FTS_TRIGGER_SQL + FTS_POPULATE_SQL, FTS_DROP_TRIGGER_SQL),
+"""
+import re
+
+from django.db import connection, migrations
+from django.db.models import Q, Value
+from django.db.models.functions import Substr
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "myapp_job_fts"
+
+# Control characters that never show up in job text; the ``highlight`` filter
+# escapes the snippet first and only then turns these into <mark> tags.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+# Snippet length in tokens. The backends cut the snippet to this themselves;
+# cutting it again in the template could split a highlight pair.
+SNIPPET_TOKENS = 24
+
+# bm25 weights per FTS column: title, description, company
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+COMPANY_WEIGHT = 5.0
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_fts_available = None
+
+FTS_CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, company,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+]
+
+FTS_TRIGGER_SQL = [
+    f"""CREATE TRIGGER IF NOT EXISTS myapp_job_fts_insert AFTER INSERT ON myapp_job BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description, company)
+        VALUES (new.id, new.title, new.description,
+                (SELECT username FROM myapp_customuser WHERE id = new.company_id));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS myapp_job_fts_update
+    AFTER UPDATE OF title, description, company_id ON myapp_job BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE} (rowid, title, description, company)
+        VALUES (new.id, new.title, new.description,
+                (SELECT username FROM myapp_customuser WHERE id = new.company_id));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS myapp_job_fts_delete AFTER DELETE ON myapp_job BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS myapp_job_fts_company
+    AFTER UPDATE OF username ON myapp_customuser BEGIN
+        UPDATE {FTS_TABLE} SET company = new.username
+        WHERE rowid IN (SELECT id FROM myapp_job WHERE company_id = new.id);
+    END""",
+]
+
+FTS_POPULATE_SQL = [
+    f"DELETE FROM {FTS_TABLE}",
+    f"""INSERT INTO {FTS_TABLE} (rowid, title, description, company)
+        SELECT job.id, job.title, job.description, company.username
+        FROM myapp_job AS job JOIN myapp_customuser AS company ON company.id = job.company_id""",
+]
+
+FTS_DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS myapp_job_fts_insert",
+    "DROP TRIGGER IF EXISTS myapp_job_fts_update",
+    "DROP TRIGGER IF EXISTS myapp_job_fts_delete",
+    "DROP TRIGGER IF EXISTS myapp_job_fts_company",
+]
+
+FTS_DROP_SQL = FTS_DROP_TRIGGER_SQL + [f"DROP TABLE IF EXISTS {FTS_TABLE}"]
+
+
+def search_terms(query):
+    """Split a search string into lower-cased word tokens."""
+    return [token.lower() for token in TOKEN_RE.findall(query or "")]
+
+
+class LikeSearchBackend:
+    """Fallback: the original icontains scan, unranked and without snippets."""
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(company__username__icontains=query)
+        ).annotate(
+            search_rank=Value(0.0),
+            search_snippet=Substr("description", 1, 200),
+        ).order_by("-created_at", "-id")
+
+
+class SqliteFtsSearchBackend:
+    """FTS5 lookup; every term is matched as a prefix and all terms must match."""
+
+    def match_expression(self, terms):
+        # Quote each term so FTS5 operators in user input are taken literally.
+        return " ".join('"%s"*' % term.replace('"', '""') for term in terms)
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return LikeSearchBackend().search(queryset, query)
+        match = self.match_expression(terms)
+        # The rowid lookup keeps the rank/snippet subqueries to one FTS row
+        # per matching job instead of re-running the match for every job.
+        matching = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        per_row = f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = myapp_job.id"
+        return queryset.filter(
+            id__in=RawSQL(matching, [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, %s, %s, %s) {per_row}",
+                [TITLE_WEIGHT, DESCRIPTION_WEIGHT, COMPANY_WEIGHT, match],
+            ),
+            search_snippet=RawSQL(
+                f"SELECT snippet({FTS_TABLE}, 1, %s, %s, %s, %s) {per_row}",
+                [HIGHLIGHT_START, HIGHLIGHT_END, "…", SNIPPET_TOKENS, match],
+            ),
+        ).order_by("-search_rank", "-created_at", "-id")
+
+
+class PostgresSearchBackend:
+    """tsvector search; add a GIN index on the same vector to keep it sub-linear."""
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import (
+            SearchHeadline, SearchQuery, SearchRank, SearchVector,
+        )
+
+        terms = search_terms(query)
+        if not terms:
+            return LikeSearchBackend().search(queryset, query)
+        search_query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms), search_type="raw", config="english"
+        )
+        vector = (
+            SearchVector("title", weight="A", config="english") +
+            SearchVector("company__username", weight="B", config="english") +
+            SearchVector("description", weight="C", config="english")
+        )
+        return queryset.annotate(
+            search_vector=vector,
+        ).filter(
+            search_vector=search_query
+        ).annotate(
+            search_rank=SearchRank(vector, search_query),
+            search_snippet=SearchHeadline(
+                "description", search_query, config="english",
+                start_sel=HIGHLIGHT_START, stop_sel=HIGHLIGHT_END,
+                max_words=SNIPPET_TOKENS,
+            ),
+        ).order_by("-search_rank", "-created_at", "-id")
+
+
+def fts_available():
+    """Whether the FTS5 table from migration 0020 exists on this database."""
+    global _fts_available
+    if _fts_available is None:
+        with connection.cursor() as cursor:
+            _fts_available = FTS_TABLE in connection.introspection.table_names(cursor)
+    return _fts_available
+
+
+def install_fts(schema_editor, triggers=True):
+    """Create and fill the FTS5 table (SQLite only), optionally with its triggers."""
+    global _fts_available
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    statements = FTS_CREATE_SQL + FTS_POPULATE_SQL + (FTS_TRIGGER_SQL if triggers else [])
+    for statement in statements:
+        schema_editor.execute(statement)
+    _fts_available = None
+
+
+def uninstall_fts(schema_editor):
+    global _fts_available
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in FTS_DROP_SQL:
+        schema_editor.execute(statement)
+    _fts_available = None
+
+
+class SqliteRunSQL(migrations.RunSQL):
+    """RunSQL for the FTS statements above; a no-op on other databases."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "sqlite":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "sqlite":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def get_search_backend():
+    if connection.vendor == "sqlite" and fts_available():
+        return SqliteFtsSearchBackend()
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return LikeSearchBackend()
+
+
+def search_jobs(queryset, query):
+    """Filter ``queryset`` to jobs matching ``query``, best match first."""
+    return get_search_backend().search(queryset, query)
@@ -0,0 +1,133 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of OFFSET, each page continues from the sort key of the last row
+shown, so the database seeks straight to it through the ordering index and
+page N costs the same as page 1. Cursors are opaque url-safe strings holding
+those key values.
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder rounds times to milliseconds; a cursor needs the exact value.
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by ``ordering``, e.g. ("-created_at", "-id").
+
+    The last key must be unique (normally the primary key) so the order is
+    total. Keys may be model fields or annotations on the queryset.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.keys = [(key.lstrip("-"), key.startswith("-")) for key in ordering]
+        self.per_page = per_page
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, name) for name, _ in self.keys]
+        raw = json.dumps(values, cls=CursorEncoder).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (ValueError, TypeError) as exc:
+            raise InvalidCursor(cursor) from exc
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise InvalidCursor(cursor)
+
+        decoded = []
+        for (name, _), value in zip(self.keys, values):
+            try:
+                field = self.queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                decoded.append(value)  # annotation: already a JSON scalar
+                continue
+            try:
+                decoded.append(field.to_python(value))
+            except ValidationError as exc:
+                raise InvalidCursor(cursor) from exc
+        return decoded
+
+    def seek(self, values, forward):
+        """Rows strictly after (forward) or before the given key values."""
+        condition = Q()
+        for i, (name, descending) in enumerate(self.keys):
+            lookup = "lt" if descending == forward else "gt"
+            step = Q(**{f"{name}__{lookup}": values[i]})
+            for j, (prev_name, _) in enumerate(self.keys[:i]):
+                step &= Q(**{prev_name: values[j]})
+            condition |= step
+        # A plain bound on the leading key lets the database range-scan the
+        # index instead of walking it from the start.
+        name, descending = self.keys[0]
+        lookup = "lte" if descending == forward else "gte"
+        return Q(**{f"{name}__{lookup}": values[0]}) & condition
+
+    def order(self, forward):
+        return [
+            f"-{name}" if descending == forward else name
+            for name, descending in self.keys
+        ]
+
+    def page(self, after=None, before=None):
+        """Return the page following cursor ``after`` (or preceding ``before``)."""
+        forward = before is None
+        cursor = after if forward else before
+        queryset = self.queryset.order_by(*self.order(forward))
+        if cursor:
+            queryset = queryset.filter(self.seek(self.decode_cursor(cursor), forward))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_previous = has_more, bool(cursor)
+        else:
+            has_next, has_previous = bool(cursor), has_more
+        return KeysetPage(
+            rows,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=self.encode_cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=self.encode_cursor(rows[0]) if rows and has_previous else None,
+        )
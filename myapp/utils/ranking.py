@@ -1,18 +1,463 @@
-from sentence_transformers import SentenceTransformer
-from sentence_transformers.util import cos_sim
-from .resume_parser import extract_text_from_resume
+import hashlib
+import threading
 
-# Load once
-model = SentenceTransformer("all-MiniLM-L6-v2")
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError
+from django.db.models import Q
+from django.utils import timezone
 
-def compute_resume_score(job_description, resume_file):
+from myapp.models import EmployeeProfile, Job, JobApplication, ResumeEmbedding, ResumeText
+from .encoders import build_encoder, chunk_text, encoder_signature, pool_chunks
+from .resume_cache import file_sha256, get_cached_resume_text, get_resume_text, get_resume_texts
+from .storage import resume_storage
+from .vector_index import VectorIndex
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+ENCODE_BATCH_SIZE = 32
+
+# Loaded on first use so that importing this module (every manage.py command,
+# every test run) does not pay for torch and the model weights.
+_encoder = None
+_encoder_lock = threading.Lock()
+
+_resume_index = None
+_resume_index_lock = threading.Lock()
+
+_job_index = None
+_job_index_lock = threading.Lock()
+
+
+def encoder_settings():
+    config = getattr(settings, "RESUME_ENCODER", {})
+    chunking = config.get("CHUNKING") or {}
+    return {
+        "backend": config.get("BACKEND", "torch"),
+        "onnx_path": config.get("ONNX_PATH"),
+        "chunking": {
+            "enabled": chunking.get("ENABLED", False),
+            "window": chunking.get("WINDOW", 240),
+            "overlap": chunking.get("OVERLAP", 48),
+            "pooling": chunking.get("POOLING", "mean"),
+            "max_tokens": chunking.get("MAX_TOKENS", 2048),
+        },
+    }
+
+
+def get_encoder():
+    """Return the process-wide encoder backend, loading it on first call."""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                config = encoder_settings()
+                _encoder = build_encoder(
+                    config["backend"], MODEL_NAME, onnx_path=config["onnx_path"]
+                )
+    return _encoder
+
+
+def embedding_key():
+    """Identifies which model/backend produced a stored embedding."""
+    return encoder_signature(encoder_settings()["backend"], MODEL_NAME)
+
+
+def resume_embedding_key():
+    """Like ``embedding_key`` but also covers the resume chunking settings."""
+    chunking = encoder_settings()["chunking"]
+    if not chunking["enabled"]:
+        return embedding_key()
+    return (
+        f"{embedding_key()}|chunks:{chunking['window']}/{chunking['overlap']}"
+        f"/{chunking['pooling']}/{chunking['max_tokens']}"
+    )
+
+
+def warm_up():
+    """Load the model ahead of the first scoring call."""
+    get_encoder()
+
+
+def text_sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_text(text):
+    """Encode text into a unit-length float32 vector."""
+    return encode_texts([text])[0]
+
+
+def encode_texts(texts, batch_size=ENCODE_BATCH_SIZE):
+    """Encode a list of texts in one batched call; returns an (n, dim) matrix."""
+    return get_encoder().encode(texts, batch_size=batch_size)
+
+
+def encode_resumes(texts, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Encode resume texts into an (n, dim) matrix.
+
+    With chunking enabled each resume is split into overlapping windows, all
+    windows of all resumes are encoded in one batch, and each resume's windows
+    are pooled into one vector. Otherwise the encoder truncates long resumes.
+    """
+    texts = list(texts)
+    chunking = encoder_settings()["chunking"]
+    if not chunking["enabled"]:
+        return encode_texts(texts, batch_size=batch_size)
+
+    encoder = get_encoder()
+    chunks, owners = [], []
+    for i, text in enumerate(texts):
+        for chunk in chunk_text(
+            encoder.tokenizer,
+            text,
+            chunking["window"],
+            chunking["overlap"],
+            chunking["max_tokens"],
+        ):
+            chunks.append(chunk)
+            owners.append(i)
+
+    matrix = encode_texts(chunks, batch_size=batch_size)
+    owners = np.asarray(owners)
+    return np.stack([
+        pool_chunks(matrix[owners == i], chunking["pooling"]) for i in range(len(texts))
+    ])
+
+
+def get_resume_embedding(file_path, encode_missing=True):
+    """
+    Return the stored embedding for a resume file, encoding it only when this
+    text has not been embedded with the current model before.
+
+    With ``encode_missing=False`` nothing is parsed or encoded: a resume that
+    has not been processed yet returns None.
+    """
+    if encode_missing:
+        resume_text = get_resume_text(file_path)
+    else:
+        resume_text = get_cached_resume_text(file_path)
+    if not resume_text:
+        return None
+
+    text_hash = text_sha256(resume_text)
+    key = resume_embedding_key()
+    cache_key = embedding_cache_key(text_hash, key)
+    cached = caches["embeddings"].get(cache_key)
+    if cached is not None:
+        return np.frombuffer(cached, dtype=np.float32)
+
+    stored = ResumeEmbedding.objects.filter(text_hash=text_hash, model_name=key).first()
+    if stored is not None:
+        caches["embeddings"].set(cache_key, bytes(stored.vector))
+        return stored.as_array()
+    if not encode_missing:
+        return None
+
+    vector = encode_resumes([resume_text])[0]
     try:
-        resume_text = extract_text_from_resume(resume_file.path)
-        if not resume_text:
-            return 0.0
-        job_emb = model.encode(job_description, convert_to_tensor=True)
-        resume_emb = model.encode(resume_text, convert_to_tensor=True)
-        score = cos_sim(job_emb, resume_emb).item()
-        return round(score * 100, 2)  # percentage
-    except Exception:
+        ResumeEmbedding.objects.create(
+            text_hash=text_hash,
+            model_name=key,
+            dim=vector.shape[0],
+            vector=vector.tobytes(),
+        )
+    except IntegrityError:
+        # Encoded concurrently by another worker; the vectors are identical.
+        pass
+    caches["embeddings"].set(cache_key, vector.tobytes())
+    return vector
+
+
+def embedding_cache_key(text_hash, key):
+    """Cache key for a resume vector; the model key is hashed to keep it short and safe."""
+    return f"resume:{text_hash}:{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
+
+
+def refresh_job_embedding(job):
+    """Encode the job's text and store it on the row."""
+    text = job.embedding_text()
+    vector = encode_text(text)
+    job.embedding = vector.tobytes()
+    job.embedding_model = embedding_key()
+    job.embedding_hash = text_sha256(text)
+    job.save(update_fields=["embedding", "embedding_model", "embedding_hash"])
+    return vector
+
+
+def job_embedding_is_current(job):
+    """True if the stored job embedding matches the job's text and model."""
+    return bool(
+        job.embedding
+        and job.embedding_model == embedding_key()
+        and job.embedding_hash == text_sha256(job.embedding_text())
+    )
+
+
+def get_job_embedding(job):
+    """
+    Return the job's embedding, re-encoding only when the description or
+    requirements changed since it was stored (or the model changed).
+    """
+    if job_embedding_is_current(job):
+        return job.embedding_array()
+    return refresh_job_embedding(job)
+
+
+def cached_resume_score(job, resume_file):
+    """
+    Score from stored embeddings only (a single dot product).
+    Returns None if the resume or the job still needs to be encoded.
+    """
+    try:
+        resume_emb = get_resume_embedding(resume_file.path, encode_missing=False)
+    except OSError:
+        return None
+    if resume_emb is None or not job_embedding_is_current(job):
+        return None
+    return round(float(np.dot(job.embedding_array(), resume_emb)) * 100, 2)
+
+
+def compute_resume_score(job, resume_file):
+    """
+    Score a resume against a job as a percentage. A resume without any text
+    scores 0.0; extraction and model errors propagate, so the scoring queue
+    retries the task and eventually marks it failed instead of saving 0.0.
+    """
+    resume_emb = get_resume_embedding(resume_file.path)
+    if resume_emb is None:
         return 0.0
+    job_emb = get_job_embedding(job)
+    score = float(np.dot(job_emb, resume_emb))  # cosine, both vectors are normalized
+    return round(score * 100, 2)  # percentage
+
+
+def get_resume_embeddings(file_paths, batch_size=ENCODE_BATCH_SIZE, failures=None):
+    """
+    Batched version of ``get_resume_embedding``.
+
+    Returns ``{path: vector or None}`` (None for a resume without text).
+    Stored embeddings are fetched with one query and every missing text is
+    encoded in a single ``model.encode`` call. Unreadable files are handled as
+    in ``get_resume_texts``: they raise, or go into ``failures`` if given.
+    """
+    texts = get_resume_texts(file_paths, failures=failures)
+    hashes = {path: text_sha256(text) for path, text in texts.items() if text}
+    key = resume_embedding_key()
+
+    vectors = {
+        row.text_hash: row.as_array()
+        for row in ResumeEmbedding.objects.filter(
+            model_name=key, text_hash__in=set(hashes.values())
+        )
+    }
+
+    missing = {}
+    for path, text_hash in hashes.items():
+        if text_hash not in vectors:
+            missing.setdefault(text_hash, texts[path])
+
+    if missing:
+        matrix = encode_resumes(missing.values(), batch_size=batch_size)
+        new_rows = []
+        for text_hash, vector in zip(missing, matrix):
+            vectors[text_hash] = vector
+            new_rows.append(ResumeEmbedding(
+                text_hash=text_hash,
+                model_name=key,
+                dim=vector.shape[0],
+                vector=vector.tobytes(),
+            ))
+        ResumeEmbedding.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+    return {path: vectors[hashes[path]] if path in hashes else None for path in texts}
+
+
+def rescore_applications(applications, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Score many applications in one batched pass and save them with
+    ``bulk_update``. Applications whose resume can't be read or parsed are
+    marked SCORE_FAILED and keep their previous score, so running this again
+    retries them. Returns ``(scored, failed)`` counts.
+    """
+    applications = [app for app in applications if app.resume]
+    if not applications:
+        return 0, 0
+
+    failures = {}
+    resume_vectors = get_resume_embeddings(
+        [app.resume.path for app in applications], batch_size=batch_size, failures=failures
+    )
+    jobs = {app.job_id: app.job for app in applications}
+
+    resume_paths = [path for path, vector in resume_vectors.items() if vector is not None]
+    resume_index = {path: i for i, path in enumerate(resume_paths)}
+    job_index = {job_id: i for i, job_id in enumerate(jobs)}
+
+    scores = None
+    if resume_paths:
+        resume_matrix = np.stack([resume_vectors[path] for path in resume_paths])
+        job_matrix = np.stack([get_job_embedding(job) for job in jobs.values()])
+        # Cosine similarity of every resume against every job in one product
+        scores = resume_matrix @ job_matrix.T
+
+    scored, failed = [], []
+    for app in applications:
+        if app.resume.path in failures:
+            app.score_status = JobApplication.SCORE_FAILED
+            failed.append(app)
+            continue
+        row = resume_index.get(app.resume.path)
+        if row is None:
+            app.match_score = 0.0  # the resume has no text
+        else:
+            app.match_score = round(float(scores[row, job_index[app.job_id]]) * 100, 2)
+        app.score_status = JobApplication.SCORE_SCORED
+        scored.append(app)
+
+    JobApplication.objects.bulk_update(scored, ["match_score", "score_status"], batch_size=500)
+    JobApplication.objects.bulk_update(failed, ["score_status"], batch_size=500)
+    return len(scored), len(failed)
+
+
+def forget_resume_file(name):
+    """
+    Drop the cached text and embeddings of a replaced resume file, unless a
+    profile or an application still points at it.
+    """
+    if not name:
+        return
+    if (
+        EmployeeProfile.objects.filter(resume=name).exists()
+        or JobApplication.objects.filter(resume=name).exists()
+    ):
+        return
+    try:
+        sha256 = file_sha256(resume_storage.path(name))
+    except (OSError, NotImplementedError):
+        return
+
+    # One text per extractor that has read this file
+    texts = list(ResumeText.objects.filter(sha256=sha256).values_list("text", flat=True))
+    if not texts:
+        return
+    ResumeText.objects.filter(sha256=sha256).delete()
+    ResumeEmbedding.objects.filter(text_hash__in={text_sha256(text) for text in texts}).delete()
+
+
+def get_resume_index():
+    """Return the process-wide index of EmployeeProfile resume embeddings."""
+    global _resume_index
+    key = resume_embedding_key()
+    with _resume_index_lock:
+        if _resume_index is None or _resume_index.key != key:
+            _resume_index = VectorIndex(settings.RESUME_INDEX_DIR, key)
+    return _resume_index
+
+
+def index_profiles(profiles, batch_size=ENCODE_BATCH_SIZE, failures=None):
+    """
+    Add (or refresh) the resume embeddings of ``profiles`` in the index.
+    Profiles without a resume, or whose resume has no text, are removed from it.
+    A resume that cannot be read or parsed raises, unless ``failures`` is given
+    (see ``get_resume_texts``); such profiles are left as they are.
+    Returns the number of profiles indexed.
+    """
+    index = get_resume_index()
+    profiles = list(profiles)
+    with_resume = [profile for profile in profiles if profile.resume]
+    vectors = get_resume_embeddings(
+        [profile.resume.path for profile in with_resume], batch_size=batch_size, failures=failures
+    )
+
+    ids, rows = [], []
+    for profile in profiles:
+        if profile.resume and profile.resume.path not in vectors:
+            continue  # failed, recorded in ``failures``
+        vector = vectors.get(profile.resume.path) if profile.resume else None
+        if vector is None:
+            index.remove(profile.pk)
+        else:
+            ids.append(profile.pk)
+            rows.append(vector)
+
+    if ids:
+        index.add_many(ids, np.stack(rows))
+    return len(ids)
+
+
+def top_candidates_for_job(job, k=20):
+    """
+    Return up to ``k`` ``(EmployeeProfile, score)`` pairs from the whole
+    candidate pool, best match first, with scores as percentages.
+
+    Only the stored job embedding is used, so this never runs the model:
+    returns None while the job is waiting to be (re-)encoded by the worker.
+    """
+    if not job_embedding_is_current(job):
+        return None
+    matches = get_resume_index().search(job.embedding_array(), k=k)
+    profiles = EmployeeProfile.objects.select_related("user").in_bulk(
+        [profile_id for profile_id, _ in matches]
+    )
+    return [
+        (profiles[profile_id], round(score * 100, 2))
+        for profile_id, score in matches
+        if profile_id in profiles
+    ]
+
+
+def get_job_index():
+    """Return the process-wide index of active job embeddings."""
+    global _job_index
+    key = embedding_key()
+    with _job_index_lock:
+        if _job_index is None or _job_index.key != key:
+            _job_index = VectorIndex(settings.JOB_INDEX_DIR, key)
+    return _job_index
+
+
+def sync_job_index(job):
+    """Add, refresh or drop one job's row so the index matches the job."""
+    index = get_job_index()
+    if job.is_active and job.embedding and job.embedding_model == index.key:
+        index.add(job.pk, job.embedding_array())
+    else:
+        index.remove(job.pk)
+
+
+def recommend_jobs_for_candidate(profile, k=6):
+    """
+    Return up to ``k`` ``(Job, score)`` pairs of open jobs the candidate has
+    not applied to, ranked by similarity to their resume.
+
+    Only precomputed embeddings are used, so this never runs the model.
+    """
+    if profile is None or not profile.resume:
+        return []
+    try:
+        resume_emb = get_resume_embedding(profile.resume.path, encode_missing=False)
+    except OSError:
+        return []
+    if resume_emb is None:
+        return []
+
+    applied = set(
+        JobApplication.objects.filter(applicant_id=profile.user_id).values_list("job_id", flat=True)
+    )
+    # Over-fetch: jobs past their deadline or already applied to are skipped below
+    matches = get_job_index().search(resume_emb, k=2 * k + len(applied))
+
+    today = timezone.now().date()
+    jobs = (
+        Job.objects.filter(is_active=True)
+        .filter(Q(application_deadline__isnull=True) | Q(application_deadline__gte=today))
+        .select_related("company")
+        .in_bulk([job_id for job_id, _ in matches])
+    )
+    return [
+        (jobs[job_id], round(score * 100, 2))
+        for job_id, score in matches
+        if job_id in jobs and job_id not in applied
+    ][:k]
@@ -0,0 +1,125 @@
+"""
+Content-addressed cache of extracted resume text.
+
+The same resume file is copied onto every JobApplication, so text is cached by
+the SHA-256 of the file's bytes and each unique resume is parsed only once.
+The extractor (PDF backend) is part of the key: backends return slightly
+different text, so switching RESUME_EXTRACTION['PDF_BACKEND'] re-extracts
+instead of mixing texts from both.
+"""
+import hashlib
+import os
+
+from django.db import IntegrityError
+
+from myapp.models import ResumeText
+from .extraction_pool import extract_text, extract_texts, extraction_settings
+from .resume_parser import resolve_pdf_backend
+from .storage import CONTENT_NAME_RE
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_sha256(file_path):
+    """Return the hex SHA-256 of a file, read in chunks."""
+    # Content-addressed uploads already carry their hash in the file name
+    match = CONTENT_NAME_RE.search(str(file_path).replace(os.sep, "/"))
+    if match:
+        return os.path.splitext(os.path.basename(file_path))[0]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extractor_name(file_path):
+    """The extractor ``extract_text`` uses for ``file_path`` under the current settings."""
+    if str(file_path).endswith(".pdf"):
+        return resolve_pdf_backend(extraction_settings()["PDF_BACKEND"])
+    return "docx2txt"
+
+
+def get_cached_resume_text(file_path):
+    """Return the cached text of a resume, or None if it was never parsed."""
+    return (
+        ResumeText.objects.filter(sha256=file_sha256(file_path), extractor=extractor_name(file_path))
+        .values_list("text", flat=True)
+        .first()
+    )
+
+
+def get_resume_text(file_path):
+    """Return the extracted text of a resume, parsing it only on a cache miss."""
+    sha256 = file_sha256(file_path)
+    extractor = extractor_name(file_path)
+
+    cached = (
+        ResumeText.objects.filter(sha256=sha256, extractor=extractor)
+        .values_list("text", flat=True)
+        .first()
+    )
+    if cached is not None:
+        return cached
+
+    text = extract_text(file_path)
+    try:
+        ResumeText.objects.create(sha256=sha256, extractor=extractor, text=text)
+    except IntegrityError:
+        # Another worker cached the same file first; its text is identical.
+        pass
+    return text
+
+
+def get_resume_texts(file_paths, failures=None):
+    """
+    Batched version of ``get_resume_text``.
+
+    Returns ``{path: text}``. Cached texts are fetched with one query and the
+    missing ones are parsed in parallel, each unique file at most once. A file that cannot be read or parsed
+    raises (after the texts that did parse are cached), unless a ``failures``
+    dict is given: the error is then stored there under its path and the path
+    is left out of the result.
+    """
+    errors = {}
+    keys = {}  # path -> (sha256, extractor)
+    for path in set(file_paths):
+        try:
+            keys[path] = (file_sha256(path), extractor_name(path))
+        except OSError as exc:
+            errors[path] = exc
+
+    cached = {
+        (sha256, extractor): text
+        for sha256, extractor, text in ResumeText.objects.filter(
+            sha256__in={sha256 for sha256, _ in keys.values()},
+            extractor__in={extractor for _, extractor in keys.values()},
+        ).values_list("sha256", "extractor", "text")
+    }
+
+    # One file per missing key, all parsed in parallel by the extraction pool
+    misses = {}
+    for path, key in keys.items():
+        if key not in cached:
+            misses.setdefault(key, path)
+    texts, extract_errors = extract_texts(misses.values())
+    new_rows = {key: texts[path] for key, path in misses.items() if path in texts}
+    for path, key in keys.items():
+        if key in misses and key not in new_rows:
+            # Not cached, so the file is parsed again on the next attempt
+            errors[path] = extract_errors[misses[key]]
+    ResumeText.objects.bulk_create(
+        [
+            ResumeText(sha256=sha256, extractor=extractor, text=text)
+            for (sha256, extractor), text in new_rows.items()
+        ],
+        ignore_conflicts=True,
+    )
+    cached.update(new_rows)
+
+    if errors and failures is None:
+        raise next(iter(errors.values()))
+    if failures is not None:
+        failures.update(errors)
+    return {path: cached[key] for path, key in keys.items() if key in cached}
@@ -1,13 +1,117 @@
+import importlib.util
+from io import StringIO
+
 import docx2txt
 import PyPDF2
 
-def extract_text_from_resume(file_path):
-    text = ""
+# "auto" picks the first installed backend. pypdfium2 is several times faster
+# than PyPDF2; pdfminer.six (even without layout analysis) measured slower
+# than PyPDF2 on our sample resumes, so it is only used when asked for.
+PDF_BACKEND_PREFERENCE = ["pypdfium2", "pypdf2", "pdfminer"]
+_BACKEND_MODULES = {"pypdfium2": "pypdfium2", "pdfminer": "pdfminer", "pypdf2": "PyPDF2"}
+
+
+def _pypdf2_pages(file_path, max_pages):
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for i, page in enumerate(reader.pages):
+            if max_pages is not None and i >= max_pages:
+                break
+            yield page.extract_text() or ""
+
+
+def _pypdfium2_pages(file_path, max_pages):
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        page_count = len(pdf) if max_pages is None else min(len(pdf), max_pages)
+        for i in range(page_count):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def _pdfminer_pages(file_path, max_pages):
+    from pdfminer.converter import TextConverter
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    with open(file_path, "rb") as f:
+        resources = PDFResourceManager(caching=True)
+        for page in PDFPage.get_pages(f, maxpages=max_pages or 0):
+            out = StringIO()
+            # laparams=None: no layout analysis, which is most of pdfminer's cost
+            device = TextConverter(resources, out, laparams=None)
+            PDFPageInterpreter(resources, device).process_page(page)
+            device.close()
+            yield out.getvalue()
+
+
+PDF_BACKENDS = {
+    "pypdfium2": _pypdfium2_pages,
+    "pdfminer": _pdfminer_pages,
+    "pypdf2": _pypdf2_pages,
+}
+
+
+def available_pdf_backends():
+    return [
+        name for name in PDF_BACKEND_PREFERENCE
+        if importlib.util.find_spec(_BACKEND_MODULES[name]) is not None
+    ]
+
+
+def resolve_pdf_backend(backend="auto"):
+    if backend == "auto":
+        return available_pdf_backends()[0]
+    if backend not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend {backend!r}; expected one of {sorted(PDF_BACKENDS)}.")
+    return backend
+
+
+def iter_pdf_pages(file_path, max_pages=None, backend="auto"):
+    """Yield the text of a PDF one page at a time."""
+    yield from PDF_BACKENDS[resolve_pdf_backend(backend)](file_path, max_pages)
+
+
+def iter_resume_text(file_path, max_pages=None, pdf_backend="auto"):
+    """Yield a resume's text in pieces (pages for PDFs, the whole body for .docx)."""
     if file_path.endswith(".pdf"):
-        with open(file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                text += page.extract_text() or ""
+        yield from iter_pdf_pages(file_path, max_pages=max_pages, backend=pdf_backend)
     elif file_path.endswith(".docx"):
-        text = docx2txt.process(file_path)
+        yield docx2txt.process(file_path)
+
+
+def extract_text_from_resume(file_path, max_pages=None, max_chars=None, max_words=None, pdf_backend="auto"):
+    """
+    Extract plain text from a .pdf or .docx resume.
+
+    Pages are streamed and joined once at the end. Extraction stops early after
+    ``max_pages`` pages, ``max_chars`` characters or ``max_words`` words, so
+    callers that only need enough text for the encoder never parse the rest.
+    """
+    parts = []
+    chars = words = 0
+    for piece in iter_resume_text(file_path, max_pages=max_pages, pdf_backend=pdf_backend):
+        parts.append(piece)
+        chars += len(piece)
+        if max_words is not None:
+            words += len(piece.split())
+        if (max_chars is not None and chars >= max_chars) or (
+            max_words is not None and words >= max_words
+        ):
+            break
+
+    # PyPDF2 and pypdfium2 don't end a page with a line break; without one
+    # the last word of a page runs into the first word of the next
+    text = "\n".join(parts)
+    if max_chars is not None:
+        text = text[:max_chars]
     return text.strip()
@@ -0,0 +1,199 @@
+"""
+Database-backed queue for resume scoring.
+
+Views call ``enqueue_application(s)`` / ``enqueue_profile`` / ``enqueue_job``
+and return straight away; the ``process_scoring_queue`` management command
+runs a worker that drains the queue, fills in ``JobApplication.match_score``
+and precomputes the embeddings of newly uploaded resumes and of new or
+edited jobs, so web workers never load the model.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from myapp.models import JobApplication, ScoringTask
+from .ranking import (
+    compute_resume_score, forget_resume_file, get_job_embedding, get_resume_index, index_profiles,
+)
+from .storage import release_resume_file
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = timedelta(seconds=30)  # doubled after every failed attempt
+STALE_AFTER = timedelta(minutes=10)
+REQUEUE_EVERY = timedelta(minutes=1)
+
+
+def enqueue_application(application):
+    """Mark the application as pending and queue it for scoring."""
+    if application.score_status != JobApplication.SCORE_PENDING:
+        application.score_status = JobApplication.SCORE_PENDING
+        application.save(update_fields=["score_status"])
+    return ScoringTask.objects.create(application=application)
+
+
+def enqueue_applications(applications):
+    """
+    Queue a batch of applications for rescoring, skipping those that
+    already have a task waiting or running. Returns the number queued.
+    """
+    busy = ScoringTask.objects.filter(
+        kind=ScoringTask.KIND_APPLICATION,
+        status__in=[ScoringTask.STATUS_QUEUED, ScoringTask.STATUS_RUNNING],
+    ).values("application_id")
+    pending = applications.exclude(pk__in=busy)
+    ids = list(pending.values_list("pk", flat=True))
+    JobApplication.objects.filter(pk__in=ids).update(score_status=JobApplication.SCORE_PENDING)
+    ScoringTask.objects.bulk_create([ScoringTask(application_id=pk) for pk in ids])
+    return len(ids)
+
+
+def enqueue_profile(profile, previous_resume=None):
+    """
+    Queue extraction and embedding of a candidate's new resume, so that
+    applying for a job later only needs a dot product. The worker also drops
+    the cached artifacts and the file of ``previous_resume``.
+    """
+    return ScoringTask.objects.create(
+        kind=ScoringTask.KIND_PROFILE, profile=profile, previous_resume=previous_resume or ""
+    )
+
+
+def enqueue_job(job):
+    """Queue encoding of a new job, or of one whose scored text was edited."""
+    return ScoringTask.objects.create(kind=ScoringTask.KIND_JOB, job=job)
+
+
+def requeue_stale_tasks(older_than=STALE_AFTER):
+    """
+    Put back tasks left 'running' by a worker that died mid-task. Tasks
+    that have used up their attempts (e.g. one that keeps killing the
+    worker) are marked failed instead. Returns the number requeued.
+    """
+    now = timezone.now()
+    stale = ScoringTask.objects.filter(status=ScoringTask.STATUS_RUNNING, updated_at__lt=now - older_than)
+    exhausted = stale.filter(attempts__gte=MAX_ATTEMPTS)
+    JobApplication.objects.filter(
+        pk__in=exhausted.filter(kind=ScoringTask.KIND_APPLICATION).values("application_id")
+    ).update(score_status=JobApplication.SCORE_FAILED)
+    exhausted.update(status=ScoringTask.STATUS_FAILED, last_error="Worker stopped during the task.", updated_at=now)
+    return stale.update(status=ScoringTask.STATUS_QUEUED, updated_at=now)
+
+
+def retry_delay(attempts):
+    """Backoff before the next try of a task that has failed ``attempts`` times."""
+    return RETRY_BACKOFF * 2 ** (attempts - 1)
+
+
+def claim_next_task():
+    """Atomically move the oldest queued task to 'running' and return it."""
+    while True:
+        task_id = (
+            ScoringTask.objects.filter(status=ScoringTask.STATUS_QUEUED)
+            .filter(Q(not_before__isnull=True) | Q(not_before__lte=timezone.now()))
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if task_id is None:
+            return None
+
+        # Only one worker can win the conditional update for a given task.
+        claimed = ScoringTask.objects.filter(
+            id=task_id, status=ScoringTask.STATUS_QUEUED
+        ).update(
+            status=ScoringTask.STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            return ScoringTask.objects.select_related("application__job", "profile", "job").get(id=task_id)
+
+
+def _score_application(application):
+    if not application.resume:
+        raise ValueError("Application has no resume.")
+    score = compute_resume_score(application.job, application.resume)
+    JobApplication.objects.filter(pk=application.pk).update(
+        match_score=score,
+        score_status=JobApplication.SCORE_SCORED,
+    )
+
+
+def _process_profile(profile, previous_resume):
+    if previous_resume:
+        # Until the new resume is indexed the profile must not rank on the old one
+        get_resume_index().remove(profile.pk)
+        forget_resume_file(previous_resume)
+        release_resume_file(previous_resume)
+    # Extracts (cached by file hash), embeds and adds the profile to the
+    # top-candidates index; a profile whose resume was cleared is removed.
+    index_profiles([profile])
+
+
+def _process_job(job):
+    # Re-encodes only if the stored embedding is stale; saving it puts the
+    # job in the recommendation index (see signals.update_job_index).
+    get_job_embedding(job)
+
+
+def process_task(task):
+    """Run the task and record the outcome."""
+    try:
+        if task.kind == ScoringTask.KIND_PROFILE:
+            _process_profile(task.profile, task.previous_resume)
+        elif task.kind == ScoringTask.KIND_JOB:
+            _process_job(task.job)
+        else:
+            _score_application(task.application)
+    except Exception as exc:
+        logger.exception("Scoring task %s failed", task.pk)
+        retry = task.attempts < MAX_ATTEMPTS
+        task.status = ScoringTask.STATUS_QUEUED if retry else ScoringTask.STATUS_FAILED
+        task.last_error = str(exc)
+        task.not_before = timezone.now() + retry_delay(task.attempts) if retry else None
+        task.save(update_fields=["status", "last_error", "not_before", "updated_at"])
+        if not retry and task.kind == ScoringTask.KIND_APPLICATION:
+            JobApplication.objects.filter(pk=task.application_id).update(
+                score_status=JobApplication.SCORE_FAILED
+            )
+        return False
+
+    task.status = ScoringTask.STATUS_DONE
+    task.last_error = ""
+    task.save(update_fields=["status", "last_error", "updated_at"])
+    return True
+
+
+def run_worker(once=False, poll_interval=2.0, max_tasks=None):
+    """
+    Process queued tasks until stopped.
+
+    With ``once=True`` the worker exits as soon as no task is ready to run
+    (tasks waiting out a retry backoff are left for later).
+    Returns the number of tasks processed.
+    """
+    processed = 0
+    next_requeue = time.monotonic()
+
+    while max_tasks is None or processed < max_tasks:
+        # Another worker may have died since we started.
+        if time.monotonic() >= next_requeue:
+            requeue_stale_tasks()
+            next_requeue = time.monotonic() + REQUEUE_EVERY.total_seconds()
+
+        task = claim_next_task()
+        if task is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        process_task(task)
+        processed += 1
+
+    return processed
@@ -0,0 +1,91 @@
+"""
+Content-addressed storage for resume files.
+
+Every upload is stored as ``<upload_to>/<sha[:2]>/<sha256><ext>``, so identical
+resumes share one file on disk however often they are uploaded, and the
+text/embedding caches (keyed by content hash) hit for all of them. A file is
+referenced by ``EmployeeProfile.resume`` and any number of
+``JobApplication.resume`` rows; it is deleted once nothing points at it, and
+``manage.py cleanup_resume_files`` reclaims anything left behind.
+
+Files written in the last ``ORPHAN_MIN_AGE`` seconds are never deleted: an
+identical upload may have stored (or re-used) the file without having saved
+its row yet.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import time
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+CONTENT_NAME_RE = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[A-Za-z0-9]+)?$")
+ORPHAN_MIN_AGE = 60 * 60  # seconds
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, *args, **kwargs):
+        # Same name means same bytes, so overwriting is never destructive
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(*args, **kwargs)
+
+    def content_name(self, name, content):
+        """Return the content-addressed name for ``content`` uploaded as ``name``."""
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        sha256 = digest.hexdigest()
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return posixpath.join(directory, sha256[:2], sha256 + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        name = self.content_name(name, content)
+        if self.exists(name):
+            # Re-used by a new upload: restart the orphan grace period
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+resume_storage = ContentAddressedStorage()
+
+
+def get_resume_storage():
+    return resume_storage
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_NAME_RE.search(name or ""))
+
+
+def resume_reference_count(name):
+    """Number of profiles and applications pointing at the file ``name``."""
+    from myapp.models import EmployeeProfile, JobApplication
+
+    return (
+        EmployeeProfile.objects.filter(resume=name).count()
+        + JobApplication.objects.filter(resume=name).count()
+    )
+
+
+def release_resume_file(name, min_age=ORPHAN_MIN_AGE):
+    """
+    Delete the file ``name`` if no profile or application references it and
+    it was not written in the last ``min_age`` seconds. A file kept for being
+    recent is left for ``cleanup_resume_files``.
+    """
+    if not name or resume_reference_count(name) or not resume_storage.exists(name):
+        return
+    if os.path.getmtime(resume_storage.path(name)) > time.time() - min_age:
+        return
+    resume_storage.delete(name)
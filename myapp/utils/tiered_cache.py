@@ -0,0 +1,269 @@
+"""
+Two-tier Django cache backend: a small per-process LRU in front of a shared
+cache (the file-based or Redis cache configured as another CACHES alias).
+
+Reads try the LRU first and fall back to the shared tier, copying hits into
+the LRU. Writes go to both. Entries stay in the LRU for at most
+LOCAL_TIMEOUT seconds, which bounds how stale another worker's write can
+look from this process; LOCAL_TIMEOUT = 0 turns the local tier off (used for
+sessions). If the shared tier fails, the error is counted and the LRU keeps
+serving, so a broken cache directory or Redis server degrades to a plain
+local-memory cache instead of failing requests.
+
+Hit/miss counters are kept per process and periodically added to counters
+in the shared tier, where the cache_stats command reads them for all workers.
+
+    CACHES = {
+        "shared": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", ...},
+        "default": {
+            "BACKEND": "myapp.utils.tiered_cache.TieredCache",
+            "KEY_PREFIX": "default",
+            "TIMEOUT": 300,
+            "OPTIONS": {"SHARED": "shared", "LOCAL_MAX_ENTRIES": 1000, "LOCAL_TIMEOUT": 5},
+        },
+    }
+"""
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+
+STAT_NAMES = ("local_hits", "shared_hits", "misses", "sets", "deletes", "errors")
+STATS_KEY = "cachestats:{}:{}"
+STATS_FLUSH_INTERVAL = 10.0  # seconds between pushes of local counters to the shared tier
+
+# Like LocMemCache, the LRU and counters live at module level so every thread
+# using the alias shares them (Django creates a backend instance per thread).
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class _Store:
+    def __init__(self):
+        self.entries = OrderedDict()  # key -> (expires_at, pickled value)
+        self.lock = threading.Lock()
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        self.unflushed = dict.fromkeys(STAT_NAMES, 0)
+        self.last_flush = time.monotonic()
+
+
+class TieredCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        # Django passes LOCATION, not the alias name; KEY_PREFIX tells aliases apart.
+        self.name = self.key_prefix or location or "default"
+        self.shared_alias = options.get("SHARED", "shared")
+        self.local_max_entries = int(options.get("LOCAL_MAX_ENTRIES", 1000))
+        self.local_timeout = float(options.get("LOCAL_TIMEOUT", 5))
+        with _stores_lock:
+            self._store = _stores.setdefault(self.name, _Store())
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    # -- statistics ----------------------------------------------------------
+
+    def _count(self, stat, n=1):
+        store = self._store
+        with store.lock:
+            store.stats[stat] += n
+            store.unflushed[stat] += n
+            due = time.monotonic() - store.last_flush >= STATS_FLUSH_INTERVAL
+        if due:
+            self.flush_stats()
+
+    def stats(self):
+        """This process's counters since it started."""
+        with self._store.lock:
+            return dict(self._store.stats)
+
+    def flush_stats(self):
+        """Add the counters not yet pushed to the shared tier's totals."""
+        store = self._store
+        with store.lock:
+            pending = {k: v for k, v in store.unflushed.items() if v}
+            store.unflushed = dict.fromkeys(STAT_NAMES, 0)
+            store.last_flush = time.monotonic()
+        try:
+            for stat, n in pending.items():
+                key = STATS_KEY.format(self.name, stat)
+                self.shared.add(key, 0, timeout=None)
+                self.shared.incr(key, n)
+        except Exception:
+            logger.warning("Could not record cache statistics for %r", self.name, exc_info=True)
+
+    def shared_stats(self):
+        """Totals across all processes, as last flushed."""
+        keys = [STATS_KEY.format(self.name, stat) for stat in STAT_NAMES]
+        values = self.shared.get_many(keys)
+        return {stat: values.get(key, 0) for stat, key in zip(STAT_NAMES, keys)}
+
+    def reset_stats(self):
+        self.shared.delete_many([STATS_KEY.format(self.name, stat) for stat in STAT_NAMES])
+        with self._store.lock:
+            self._store.stats = dict.fromkeys(STAT_NAMES, 0)
+            self._store.unflushed = dict.fromkeys(STAT_NAMES, 0)
+
+    # -- local tier ----------------------------------------------------------
+
+    def _local_get(self, key):
+        if not self.local_timeout:
+            return False, None
+        with self._store.lock:
+            entry = self._store.entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self._store.entries[key]
+                return False, None
+            self._store.entries.move_to_end(key)
+        return True, pickle.loads(pickled)
+
+    def _local_set(self, key, value, timeout):
+        if not self.local_timeout:
+            return
+        ttl = self.local_timeout if timeout is None else min(self.local_timeout, timeout)
+        if ttl <= 0:
+            self._local_delete(key)
+            return
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._store.lock:
+            entries = self._store.entries
+            entries[key] = (time.monotonic() + ttl, pickled)
+            entries.move_to_end(key)
+            while len(entries) > self.local_max_entries:
+                entries.popitem(last=False)
+
+    def _local_delete(self, key):
+        with self._store.lock:
+            self._store.entries.pop(key, None)
+
+    # -- cache API -----------------------------------------------------------
+
+    def _shared_call(self, method, *args, default=None, **kwargs):
+        try:
+            return getattr(self.shared, method)(*args, **kwargs)
+        except Exception:
+            self._count("errors")
+            logger.warning("Shared cache %r failed on %s", self.shared_alias, method, exc_info=True)
+            return default
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        found, value = self._local_get(key)
+        if found:
+            self._count("local_hits")
+            return value
+        sentinel = object()
+        value = self._shared_call("get", key, sentinel, default=sentinel)
+        if value is sentinel:
+            self._count("misses")
+            return default
+        self._count("shared_hits")
+        self._local_set(key, value, None)
+        return value
+
+    def get_many(self, keys, version=None):
+        made = {self.make_and_validate_key(key, version=version): key for key in keys}
+        result, missing = {}, []
+        for made_key, key in made.items():
+            found, value = self._local_get(made_key)
+            if found:
+                result[key] = value
+            else:
+                missing.append(made_key)
+        if result:
+            self._count("local_hits", len(result))
+        if missing:
+            shared = self._shared_call("get_many", missing, default={})
+            for made_key, value in shared.items():
+                result[made[made_key]] = value
+                self._local_set(made_key, value, None)
+            if shared:
+                self._count("shared_hits", len(shared))
+            if len(missing) > len(shared):
+                self._count("misses", len(missing) - len(shared))
+        return result
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        timeout = self._seconds(timeout)
+        self._shared_call("set", key, value, timeout)
+        self._local_set(key, value, timeout)
+        self._count("sets")
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        timeout = self._seconds(timeout)
+        # The shared tier decides whether the key already exists; if it is
+        # unreachable, fall back to this process's view.
+        added = self._shared_call("add", key, value, timeout, default=None)
+        if added is None:
+            added = not self._local_get(key)[0]
+        if added:
+            self._local_set(key, value, timeout)
+            self._count("sets")
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        timeout = self._seconds(timeout)
+        # The LRU entry keeps its own short expiry unless the key now expires sooner
+        if timeout is not None and timeout <= 0:
+            self._local_delete(key)
+        return bool(self._shared_call("touch", key, timeout, default=False))
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._local_delete(key)
+        self._count("deletes")
+        return bool(self._shared_call("delete", key, default=False))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        # Counters must be shared between workers, so incr always goes to the
+        # shared tier (a ValueError for a missing key propagates as usual).
+        try:
+            value = self.shared.incr(key, delta)
+        except ValueError:
+            raise
+        except Exception:
+            self._count("errors")
+            logger.warning("Shared cache %r failed on incr", self.shared_alias, exc_info=True)
+            # Count in this process only, like the other methods fall back
+            found, value = self._local_get(key)
+            if not found:
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+        self._local_set(key, value, None)
+        return value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        if self._local_get(key)[0]:
+            return True
+        return bool(self._shared_call("has_key", key, default=False))
+
+    def clear(self):
+        """Clear this process's LRU and the *whole* shared tier (all aliases)."""
+        with self._store.lock:
+            self._store.entries.clear()
+        self._shared_call("clear")
+
+    def close(self, **kwargs):
+        self._shared_call("close", **kwargs)
+
+    def _seconds(self, timeout):
+        """Resolve DEFAULT_TIMEOUT to this alias's TIMEOUT; None means never expire."""
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
@@ -0,0 +1,306 @@
+"""
+In-process vector index over stored embeddings.
+
+Vectors live in a memory-mapped float32 ``.npy`` matrix next to an ``ids``
+array, so every worker process shares the same pages and a query is one
+matrix-vector product plus a partial sort (a few milliseconds for 100k rows).
+Rows are added and removed in place, and the shared mapping lets every
+reader see them at once. Each write bumps a version number in
+``meta.json`` and logs the rows it touched, so a reader that falls behind
+only re-reads those rows to update its id -> row mapping instead of
+rebuilding it for the whole index.
+
+Growing the index writes both arrays as a new generation
+(``vectors.<n>.npy`` / ``ids.<n>.npy``) and then points ``meta.json`` at
+it, so a reader in another process never pairs one generation's vectors
+with another's ids.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+EMPTY = -1
+INITIAL_CAPACITY = 1024
+CHANGE_LOG_LENGTH = 64  # versions a reader can lag behind and still catch up row by row
+MAX_LOGGED_ROWS = 1024  # bigger writes make readers reload the whole mapping
+
+
+class VectorIndex:
+    def __init__(self, directory, key):
+        self.directory = Path(directory)
+        # Embedding signature the vectors were produced with; an index built
+        # with another model/backend is treated as empty until rebuilt.
+        self.key = key
+        self._lock = threading.RLock()
+        self._version = None
+        self._generation = None
+        self._vectors = None
+        self._ids = None
+        self._row_ids = None  # ``_ids`` as of our last sync, to diff against
+        self._rows = {}
+        self._free = set()
+
+    @property
+    def meta_path(self):
+        return self.directory / "meta.json"
+
+    def vectors_path(self, generation):
+        return self.directory / f"vectors.{generation}.npy"
+
+    def ids_path(self, generation):
+        return self.directory / f"ids.{generation}.npy"
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    def __contains__(self, item_id):
+        with self._lock:
+            self._refresh()
+            return item_id in self._rows
+
+    # -- loading -----------------------------------------------------------
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, dim, changed_rows=None):
+        """Publish a new version; ``changed_rows`` None means readers must reload."""
+        version = (self._version or 0) + 1
+        previous = self._read_meta() or {}
+        changes = previous.get("changes", []) if previous.get("generation") == self._generation else []
+        if changed_rows is not None and len(changed_rows) > MAX_LOGGED_ROWS:
+            changed_rows = None
+        changes.append([version, None if changed_rows is None else sorted(changed_rows)])
+        meta = {
+            "key": self.key,
+            "dim": dim,
+            "version": version,
+            "generation": self._generation,
+            "changes": changes[-CHANGE_LOG_LENGTH:],
+        }
+        tmp_path = self.meta_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+        self._version = meta["version"]
+
+    def _reset(self):
+        self._vectors = self._ids = self._row_ids = None
+        self._rows, self._free = {}, set()
+
+    def _load(self, meta):
+        """Map the generation ``meta`` points at; False if it was swapped out meanwhile."""
+        self._version = meta["version"] if meta else None
+        self._generation = meta.get("generation") if meta else None
+        if meta is None or meta["key"] != self.key or meta["dim"] is None or self._generation is None:
+            self._reset()
+            return True
+
+        try:
+            vectors = np.load(self.vectors_path(self._generation), mmap_mode="r+")
+            ids = np.load(self.ids_path(self._generation), mmap_mode="r+")
+        except FileNotFoundError:
+            # A writer replaced this generation after we read meta.json
+            self._reset()
+            return False
+        if vectors.shape[0] != ids.shape[0]:
+            self._reset()
+            return False
+
+        self._vectors, self._ids = vectors, ids
+        self._row_ids = np.array(ids)
+        occupied = np.flatnonzero(self._row_ids != EMPTY)
+        self._rows = dict(zip(self._row_ids[occupied].tolist(), occupied.tolist()))
+        self._free = set(np.flatnonzero(self._row_ids == EMPTY).tolist())
+        return True
+
+    def _changed_rows(self, meta):
+        """
+        Rows written since our version, or None if the change log doesn't
+        reach back that far or the files themselves were replaced.
+        """
+        if (
+            meta is None
+            or self._ids is None
+            or meta["key"] != self.key
+            or meta.get("generation") != self._generation
+            or meta["dim"] != self._vectors.shape[1]
+        ):
+            return None
+        logged = dict((version, rows) for version, rows in meta.get("changes", []))
+        changed = set()
+        for version in range(self._version + 1, meta["version"] + 1):
+            rows = logged.get(version)
+            if rows is None:
+                return None
+            changed.update(rows)
+        return changed
+
+    def _sync_rows(self, rows):
+        """Update the id -> row mapping for ``rows`` from the shared ids array."""
+        for row in rows:
+            old, new = int(self._row_ids[row]), int(self._ids[row])
+            if old == new:
+                continue
+            if self._rows.get(old) == row:
+                del self._rows[old]
+            if new == EMPTY:
+                self._free.add(row)
+            else:
+                self._rows[new] = row
+                self._free.discard(row)
+            self._row_ids[row] = new
+
+    def _refresh(self):
+        """Catch up with changes another process made since we last looked."""
+        for _ in range(5):
+            meta = self._read_meta()
+            if (meta and meta["version"]) == self._version:
+                return
+            rows = self._changed_rows(meta)
+            if rows is not None:
+                self._sync_rows(rows)
+                self._version = meta["version"]
+                return
+            if self._load(meta):
+                return
+        raise RuntimeError(f"Vector index in {self.directory} kept changing while being loaded.")
+
+    def _remove_files(self, keep=()):
+        """Delete array files other than ``keep`` (old generations, or all of them)."""
+        for pattern in ("vectors*.npy", "ids*.npy"):
+            for path in self.directory.glob(pattern):
+                if path not in keep:
+                    try:
+                        os.remove(path)
+                    except OSError:  # still mapped on Windows; removed next time
+                        pass
+
+    # -- writing -----------------------------------------------------------
+
+    @contextmanager
+    def _write_lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.directory / "write.lock", "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _resize(self, dim, capacity):
+        """Copy the index into a new generation of ``capacity`` rows and switch to it."""
+        generation = (self._generation or 0) + 1
+        vectors = open_memmap(
+            self.vectors_path(generation), mode="w+", dtype=np.float32, shape=(capacity, dim)
+        )
+        ids = open_memmap(self.ids_path(generation), mode="w+", dtype=np.int64, shape=(capacity,))
+        ids[:] = EMPTY
+
+        if self._ids is not None:
+            used = len(self._ids)
+            vectors[:used] = self._vectors
+            ids[:used] = self._ids
+        vectors.flush()
+        ids.flush()
+        del vectors, ids
+
+        # Readers follow meta.json, so this one write switches both files at once
+        self._generation = generation
+        self._write_meta(dim)
+        self._load(self._read_meta())
+        self._remove_files(keep={self.vectors_path(generation), self.ids_path(generation)})
+
+    def add_many(self, item_ids, matrix):
+        """Insert or overwrite the vectors for ``item_ids`` (one row each)."""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if not len(item_ids):
+            return
+
+        with self._write_lock():
+            dim = matrix.shape[1]
+            if self._vectors is not None and self._vectors.shape[1] != dim:
+                raise ValueError(
+                    f"Vector dimension {dim} does not match index dimension {self._vectors.shape[1]}."
+                )
+
+            new_ids = [i for i in dict.fromkeys(item_ids) if i not in self._rows]
+            if self._ids is None or len(new_ids) > len(self._free):
+                capacity = len(self._ids) if self._ids is not None else 0
+                needed = len(self._rows) + len(new_ids)
+                self._resize(dim, max(INITIAL_CAPACITY, capacity * 2, needed))
+
+            changed = set()
+            for item_id, vector in zip(item_ids, matrix):
+                row = self._rows.get(item_id)
+                if row is None:
+                    row = self._free.pop()
+                self._vectors[row] = vector
+                self._ids[row] = item_id
+                self._sync_rows([row])
+                changed.add(row)
+
+            self._vectors.flush()
+            self._ids.flush()
+            self._write_meta(dim, changed)
+
+    def add(self, item_id, vector):
+        self.add_many([item_id], np.asarray(vector, dtype=np.float32)[None, :])
+
+    def remove(self, item_id):
+        """Drop ``item_id`` from the index; a no-op if it is not there."""
+        if not self.meta_path.exists():
+            return
+        with self._write_lock():
+            row = self._rows.get(item_id)
+            if row is None:
+                return
+            self._ids[row] = EMPTY
+            self._vectors[row] = 0
+            self._sync_rows([row])
+            self._ids.flush()
+            self._vectors.flush()
+            self._write_meta(self._vectors.shape[1], [row])
+
+    def clear(self):
+        """Remove every vector (used before a full rebuild)."""
+        with self._write_lock():
+            self._reset()
+            self._write_meta(None)
+            self._remove_files()
+
+    # -- querying ----------------------------------------------------------
+
+    def search(self, query, k=10):
+        """Return up to ``k`` ``(item_id, cosine)`` pairs, best first."""
+        with self._lock:
+            self._refresh()
+            if not self._rows or k <= 0:
+                return []
+
+            scores = self._vectors @ np.asarray(query, dtype=np.float32)
+            scores[self._ids == EMPTY] = -np.inf
+
+            k = min(k, len(self._rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(self._ids[row]), float(scores[row])) for row in top]
@@ -10,11 +10,21 @@ from django.utils import timezone
 from django.core.paginator import Paginator
 from django.urls import reverse
 from django.views.decorators.http import require_POST
+from django.db import IntegrityError, transaction
 from django.db.models import Count
-from collections import defaultdict
-from django.db.models import Q
+from django.db.models import Case, F, Value, When, Window
+from django.db.models.functions import RowNumber, Substr
 from django.utils.timezone import now
-from myapp.utils.ranking import compute_resume_score
+from myapp.utils.fragment_cache import fragment_context
+from myapp.utils.job_expiry import open_jobs
+from myapp.utils.job_search import search_jobs
+from myapp.utils.pagination import InvalidCursor, KeysetPaginator
+from myapp.utils.scoring_queue import enqueue_application, enqueue_applications, enqueue_job, enqueue_profile
+from myapp.utils.ranking import (
+    cached_resume_score,
+    recommend_jobs_for_candidate,
+    top_candidates_for_job,
+)
 from django.http import JsonResponse
 from django.contrib.auth import update_session_auth_hash
 
@@ -55,11 +65,16 @@ def login_view(request):
         m for m in all_msgs
         if ('login' in m.tags and m.level == messages.ERROR)
     ]
-    keep_msgs = [m for m in all_msgs if m not in login_msgs]
 
-    # ✅ Re-add non-login messages so they appear later (not lost)
-    for m in keep_msgs:
-        messages.add_message(request, m.level, m.message, extra_tags=m.tags)
+    if login_msgs:
+        # ✅ Re-add non-login messages so they appear later (not lost)
+        keep_msgs = [m for m in all_msgs if m not in login_msgs]
+        for m in keep_msgs:
+            messages.add_message(request, m.level, m.message, extra_tags=m.tags)
+    else:
+        # ✅ Nothing taken out: leave the queue as it was instead of
+        # rewriting the same messages back to the cookie/session
+        storage.used = False
 
     return render(request, 'login.html', {
         'form': form,
@@ -153,21 +168,27 @@ def company_dashboard(request):
     if not getattr(request.user, 'is_company', False):
         return HttpResponseForbidden("Access denied.")
 
-    # Fetch jobs posted by the logged-in company + application counts
-    jobs = (
-        Job.objects.filter(company=request.user)
-        .annotate(applicant_count=Count("applications"))  # 'applications' is related_name in JobApplication model
-        .order_by("-created_at")  # newest first
-    )
+    # Fetch jobs posted by the logged-in company; application counts are the
+    # stored Job.applicant_count counters (see utils/counters.py)
+    jobs = Job.objects.filter(company=request.user).order_by("-created_at")  # newest first
 
+    profile = getattr(request.user, "companyprofile", None)
     return render(request, "company_dashboard.html", {
         "jobs": jobs,
-        "total_jobs": jobs.count()
+        "total_jobs": profile.job_count if profile else 0,
+        "total_applications": profile.application_count if profile else 0,
+        **fragment_context(request.user),
     })
 
 @login_required
 def candidate_home(request):
-    return render(request, 'home.html')
+    # ✅ "Jobs for you" feed from precomputed resume & job embeddings
+    recommended_jobs = []
+    if getattr(request.user, 'is_employee', False):
+        profile = getattr(request.user, 'employeeprofile', None)
+        recommended_jobs = recommend_jobs_for_candidate(profile)
+
+    return render(request, 'home.html', {'recommended_jobs': recommended_jobs})
 
 
 
@@ -206,7 +227,8 @@ def hr_list(request):
     else:
         hrs = HRProfile.objects.none()  # safer than []
     
-    return render(request, "hr_list.html", {"hrs": hrs})
+    # ✅ hrs stays lazy: it is only queried when the cached fragment is stale
+    return render(request, "hr_list.html", {"hrs": hrs.select_related("user"), **fragment_context(request.user)})
 
 
 #==============================
@@ -331,7 +353,8 @@ def profile_view(request):
     # Base context
     context = {
         "profile": profile,
-        "skills_list": skills_list
+        "skills_list": skills_list,
+        **fragment_context(request.user),
     }
 
     # Employee profile
@@ -341,6 +364,7 @@ def profile_view(request):
     # Company profile
     elif request.user.is_company:
         template = "company_profile.html"
+        context["total_jobs"] = profile.job_count if profile else 0
 
     # HR profile
     elif request.user.is_hr:
@@ -365,6 +389,11 @@ def profile_view(request):
             "upcoming_interviews": upcoming_interviews,
             "stats": stats
         })
+        # ✅ The page shows the company and its jobs, so their changes must
+        # invalidate the cached fragment too
+        context.update(fragment_context(
+            request.user, include_jobs=True, company=profile.company if profile else None,
+        ))
 
     # Fallback generic profile
     else:
@@ -396,6 +425,9 @@ def profile_edit(request):
 
     FormClass = form_map[user_type]
 
+    # Binding the form replaces profile.resume, so remember the old file first
+    previous_resume = profile.resume.name if user_type == "employee" else None
+
     if request.method == "POST":
         form = FormClass(
             request.POST, 
@@ -404,7 +436,10 @@ def profile_edit(request):
             user=request.user
         )
         if form.is_valid():
-            form.save()
+            profile = form.save()
+            # ✅ Precompute text & embedding of a new resume in the background
+            if user_type == "employee" and "resume" in form.changed_data:
+                enqueue_profile(profile, previous_resume=previous_resume)
             messages.success(request, "Profile updated successfully!")
             return redirect("profile")
         else:
@@ -435,18 +470,16 @@ def job_list(request):
         messages.error(request, "You are not authorized to view job listings.")
         return redirect("home")
 
-    # ✅ Step 1: Deactivate expired jobs before listing
-    deactivate_expired_jobs()
-
-    # ✅ Step 2: Get all jobs posted by this company
+    # ✅ Step 1: Get all jobs posted by this company (expired ones are shown
+    # as such from their deadline; the sweeper deactivates them)
     job_qs = Job.objects.filter(company=request.user).order_by('-created_at')
 
-    # ✅ Step 3: Paginate results
+    # ✅ Step 2: Paginate results
     paginator = Paginator(job_qs, 10)  # 10 jobs per page
     page_number = request.GET.get('page')
     jobs = paginator.get_page(page_number)
 
-    return render(request, "jobs/job_list.html", {"jobs": jobs})
+    return render(request, "jobs/job_list.html", {"jobs": jobs, "today": timezone.now().date()})
 
 
 @login_required
@@ -460,7 +493,11 @@ def job_create(request):
         if form.is_valid():
             job = form.save(commit=False)
             job.company = request.user
-            job.save()
+            # ✅ The insert, the company's job_count update and the queued
+            # embedding task commit together; the worker encodes the job
+            with transaction.atomic():
+                job.save()
+                enqueue_job(job)
             messages.success(request, "Job posted successfully!")
             return redirect(reverse("job_list"))
         else:
@@ -478,7 +515,15 @@ def job_edit(request, job_id):
     if request.method == "POST":
         form = JobForm(request.POST, instance=job)
         if form.is_valid():
-            form.save()
+            job = form.save(commit=False)
+            # ✅ Re-encode (in the worker) only when the scored text changed
+            text_changed = bool({"description", "requirements"} & set(form.changed_data))
+            if text_changed:
+                job.embedding_hash = ""  # stale until the worker re-encodes it
+            with transaction.atomic():
+                job.save()
+                if text_changed:
+                    enqueue_job(job)
             messages.success(request, "Job updated successfully!")
             return redirect(reverse("job_list"))
         else:
@@ -497,40 +542,28 @@ def job_delete(request, job_id):
     return redirect(reverse("job_list"))
 
 
-def deactivate_expired_jobs():
-    """Mark expired jobs as inactive in the DB."""
-    today = timezone.now().date()
-    Job.objects.filter(
-        is_active=True,
-        application_deadline__lt=today
-    ).update(is_active=False)
-
 @login_required
 def browse_jobs(request):
-    # ✅ Step 1: Deactivate expired jobs in DB
-    deactivate_expired_jobs()
-
     today = timezone.now().date()
 
-    # ✅ Step 2: Get only active & not expired jobs
-    jobs = Job.objects.filter(
-        is_active=True
-    ).filter(
-        Q(application_deadline__isnull=True) | Q(application_deadline__gte=today)
-    ).order_by('-created_at')
+    # ✅ Get only active & not expired jobs (the sweep_expired_jobs command
+    # flips is_active later; this page only reads)
+    jobs = open_jobs(today=today).select_related('company').only(
+        # ✅ Only the columns the job cards show; the description is cut in SQL
+        'id', 'title', 'is_active', 'created_at', 'application_deadline',
+        'job_type', 'experience_level', 'company__username',
+    ).annotate(summary=Substr('description', 1, 200))
 
     # ✅ Get filter parameters from GET request
     search_query = request.GET.get('q', '').strip()
     job_type = request.GET.get('job_type', '')
     experience_level = request.GET.get('experience_level', '')
 
-    # ✅ Apply search filter
+    # ✅ Apply search filter (full-text index, best matches first)
+    ordering = ('-created_at', '-id')
     if search_query:
-        jobs = jobs.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(company__username__icontains=search_query)  # assuming company = CustomUser
-        )
+        jobs = search_jobs(jobs, search_query)
+        ordering = ('-search_rank',) + ordering
 
     # ✅ Apply job type filter
     if job_type:
@@ -540,8 +573,17 @@ def browse_jobs(request):
     if experience_level:
         jobs = jobs.filter(experience_level=experience_level)
 
+    # ✅ Keyset pagination: each page seeks past the last card of the previous one
+    paginator = KeysetPaginator(jobs, ordering, per_page=10)
+    try:
+        page = paginator.page(after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor:
+        page = paginator.page()
+
     return render(request, "jobs/browse_jobs.html", {
-        "jobs": jobs,
+        "jobs": page,
+        "page": page,
+        "today": today,
         "search_query": search_query,
         "selected_job_type": job_type,
         "selected_experience": experience_level,
@@ -568,11 +610,6 @@ def job_detail(request, job_id):
 def apply_for_job(request, job_id):
     job = get_object_or_404(Job, id=job_id)
 
-    # Check if already applied
-    if JobApplication.objects.filter(job=job, applicant=request.user).exists():
-        messages.warning(request, "You have already applied for this job.")
-        return redirect("job_detail", job_id=job.id)
-
     # Ensure employee profile exists
     employee_profile = getattr(request.user, "employeeprofile", None)
     if not employee_profile:
@@ -584,20 +621,32 @@ def apply_for_job(request, job_id):
         messages.error(request, "Please upload your resume in your profile before applying.")
         return redirect("job_detail", job_id=job.id)
 
-    # ✅ Create the application
-    application = JobApplication.objects.create(
-        job=job,
-        applicant=request.user,
-        resume=employee_profile.resume
-    )
+    # ✅ Create the application; the (job, applicant) unique constraint
+    # rejects duplicates, including two concurrent submits
+    try:
+        with transaction.atomic():
+            application = JobApplication.objects.create(
+                job=job,
+                applicant=request.user,
+                resume=employee_profile.resume
+            )
+    except IntegrityError:
+        # SQLite doesn't name the violated constraint, so look for the row
+        if not JobApplication.objects.filter(job=job, applicant=request.user).exists():
+            raise
+        messages.warning(request, "You have already applied for this job.")
+        return redirect("job_detail", job_id=job.id)
 
-    # ✅ Compute BERT match score against job description
-    if application.resume:
-        score = compute_resume_score(job.description, application.resume)
+    # ✅ Score right away from precomputed embeddings, else queue BERT scoring
+    score = cached_resume_score(job, application.resume)
+    if score is None:
+        enqueue_application(application)
+        messages.success(request, "Your application has been submitted! Your match score will be available shortly.")
+    else:
         application.match_score = score
-        application.save()
-
-    messages.success(request, f"Your application has been submitted! Match Score: {application.match_score}%")
+        application.score_status = JobApplication.SCORE_SCORED
+        application.save(update_fields=["match_score", "score_status"])
+        messages.success(request, f"Your application has been submitted! Match Score: {score}%")
     return redirect("job_detail", job_id=job.id)
 
 
@@ -611,6 +660,36 @@ def view_applicants(request, job_id):
     })
 
 
+@login_required
+def job_top_candidates(request, job_id):
+    """Best-matching candidates from the whole profile pool, applied or not."""
+    job = get_object_or_404(Job, id=job_id, company=request.user)
+
+    try:
+        k = min(max(int(request.GET.get("k", 20)), 1), 100)
+    except ValueError:
+        k = 20
+
+    # ✅ None while the scoring worker is still encoding the job
+    matches = top_candidates_for_job(job, k=k)
+    applied_ids = set(
+        JobApplication.objects.filter(job=job).values_list("applicant_id", flat=True)
+    )
+
+    return render(request, "jobs/top_candidates.html", {
+        "job": job,
+        "matches": matches or [],
+        "pending": matches is None,
+        "applied_ids": applied_ids,
+    })
+
+
+def _page_query(request, domain, number):
+    query = request.GET.copy()
+    query[f"page_{domain}"] = number
+    return "?" + query.urlencode()
+
+
 @login_required
 def manage_applications(request):
     if not getattr(request.user, 'is_company', False):
@@ -639,21 +718,57 @@ def manage_applications(request):
 
         return redirect("manage_applications")
 
-    # ✅ Group applications by job domain
-    grouped_apps = defaultdict(list)
-    for app in applications:
-        grouped_apps[app.job.domain].append(app)
-
-    # ✅ Sort each group by match_score (higher = better)
-    for domain, apps in grouped_apps.items():
-        grouped_apps[domain] = sorted(
-            apps,
-            key=lambda x: x.match_score or 0,
-            reverse=True
-        )
+    # ✅ Count applications per domain in the database
+    per_page = 20  # applications per domain section
+    totals = dict(
+        applications.order_by().values_list("job__domain").annotate(total=Count("id"))
+    )
+
+    # ✅ Each domain section has its own page (?page_<domain>=N)
+    sections = {}
+    for domain, total in sorted(totals.items()):
+        num_pages = max(1, -(-total // per_page))
+        try:
+            number = int(request.GET.get(f"page_{domain}", 1))
+        except ValueError:
+            number = 1
+        number = min(max(number, 1), num_pages)
+        sections[domain] = {
+            "domain": domain,
+            "apps": [],
+            "total": total,
+            "number": number,
+            "num_pages": num_pages,
+            "start": (number - 1) * per_page + 1,
+            # Page links keep the other sections' pages
+            "prev_query": _page_query(request, domain, number - 1) if number > 1 else None,
+            "next_query": _page_query(request, domain, number + 1) if number < num_pages else None,
+        }
+
+    # ✅ Rank applications within their domain (best score first, unscored
+    # last) and fetch only the rows on each domain's current page
+    if sections:
+        offsets = [
+            When(job__domain=domain, then=Value(section["start"] - 1))
+            for domain, section in sections.items()
+        ]
+        ranked = applications.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("job__domain"),
+                order_by=[F("match_score").desc(nulls_last=True), F("applied_at").desc(), F("id").desc()],
+            ),
+            offset=Case(*offsets, default=Value(0)),
+        ).filter(
+            position__gt=F("offset"),
+            position__lte=F("offset") + per_page,
+        ).order_by("job__domain", "position")
+
+        for app in ranked:
+            sections[app.job.domain]["apps"].append(app)
 
     return render(request, "jobs/manage_applications.html", {
-        "grouped_apps": dict(grouped_apps)  # pass grouped & sorted apps
+        "sections": list(sections.values()),
     })
 
 #==============================
@@ -661,8 +776,11 @@ def manage_applications(request):
 #==============================
 @login_required
 def my_applications(request):
-    applications = JobApplication.objects.filter(applicant=request.user).select_related('job')
-    return render(request, "my_applications.html", {"applications": applications})
+    applications = JobApplication.objects.filter(applicant=request.user).select_related('job', 'job__company')
+    return render(request, "my_applications.html", {
+        "applications": applications,
+        **fragment_context(request.user, include_jobs=True),
+    })
 
 
 
@@ -675,16 +793,15 @@ def parse_resumes(request, domain):
     if not getattr(request.user, 'is_company', False):
         return JsonResponse({"error": "Access denied."}, status=403)
 
-    # Get all applications for jobs in this domain
+    # Get all applications with a resume for jobs in this domain
     applications = JobApplication.objects.filter(
         job__company=request.user,
         job__domain=domain
-    )
+    ).exclude(resume="").exclude(resume__isnull=True).select_related("job")
 
-    # Dummy scoring logic (replace with actual parsing + scoring later)
-    for app in applications:
-        if app.resume:  
-            app.match_score = len(app.resume.name) * 2  # fake score for testing
-            app.save()
+    # ✅ Scoring runs in the queue worker, not in this request
+    with transaction.atomic():
+        queued = enqueue_applications(applications)
+    messages.success(request, f"Queued {queued} application(s) for scoring.")
 
-    return redirect("manage_applications")  # after scoring, go back
+    return redirect("manage_applications")  # scores appear as the worker fills them in